@@ -0,0 +1,7 @@
+import pygame as pg
+
+
+def init_display():
+    """Initialize a minimal display, needed to load the textures with `convert`. """
+    pg.init()
+    pg.display.set_mode((1, 1))
@@ -0,0 +1,62 @@
+"""Benchmark of the creation of chunks, comparing the vectorized collider extraction with the former per-block one.
+
+Run from the mineflat dir with: `python -m benchmarks.chunk`
+"""
+from timeit import Timer
+
+from benchmarks import init_display
+from core.classes import WVec, Colliders
+from core.constants import CHUNK_W_SIZE
+from world.chunk import Chunk
+from world.generation import WorldGenerator
+
+
+class PerBlockCollidersChunk(Chunk):
+    """Chunk building its colliders the former way: one lookup per neighbor of each block, into lists. """
+    def _update_colliders(self, *args):
+        self._colliders = Colliders([], [], [], [])
+        for block_w_pos in self.blocks_map:
+            if not (block_w_pos + WVec(-1, 0)) in self.blocks_map:
+                self.colliders.left.append(block_w_pos)
+            if not (block_w_pos + WVec(+1, 0)) in self.blocks_map:
+                self.colliders.right.append(block_w_pos)
+            if not (block_w_pos + WVec(0, -1)) in self.blocks_map:
+                self.colliders.down.append(block_w_pos)
+            if not (block_w_pos + WVec(0, +1)) in self.blocks_map:
+                self.colliders.up.append(block_w_pos)
+
+
+# Chunks around the surface, where most of the blocks have some exposed faces.
+CHUNK_W_POSS = [WVec(x, y) * CHUNK_W_SIZE for x in range(-4, 4) for y in range(6, 10)]
+
+
+def time_per_chunk(statement, namespace, number):
+    timer = Timer(statement, globals=namespace)
+    return min(timer.repeat(repeat=5, number=number)) / (number * len(CHUNK_W_POSS))
+
+
+def main(number=5, seed=0.15681):
+    init_display()
+    generator = WorldGenerator(seed)
+
+    print(f"{'per chunk':<22}{'per block (us)':>16}{'vectorized (us)':>17}{'speedup':>10}")
+    cases = {
+        "colliders": "for chunk in chunks: chunk._update_colliders()",
+        "creation": "for w_pos in CHUNK_W_POSS: chunk_type(w_pos, generator).colliders",
+        }
+    for name, statement in cases.items():
+        times = []
+        for chunk_type in (PerBlockCollidersChunk, Chunk):
+            namespace = {
+                "CHUNK_W_POSS": CHUNK_W_POSS,
+                "chunk_type": chunk_type,
+                "generator": generator,
+                "chunks": [chunk_type(w_pos, generator) for w_pos in CHUNK_W_POSS],
+                }
+            times.append(time_per_chunk(statement, namespace, number))
+        per_block_time, vectorized_time = times
+        print(f"{name:<22}{per_block_time * 1e6:>16.0f}{vectorized_time * 1e6:>17.0f}{per_block_time / vectorized_time:>9.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""Consistency check and throughput benchmark of the noise-based terrain generation.
+
+Run from the mineflat dir with: `python -m benchmarks.generation`
+"""
+import sys
+from timeit import Timer
+
+import numpy as np
+
+from core.classes import WVec
+from core.constants import CHUNK_W_SIZE, WORLD_HEIGHT_BOUNDS
+from item.block import BlockType
+from world.generation import WorldGenerator
+from world.noise import PerlinNoise
+
+# A 256-tall column of chunks, from just below the world to its top.
+COLUMN_CHUNK_W_POSS = [
+    WVec(0, y) * CHUNK_W_SIZE
+    for y in range(-1, WORLD_HEIGHT_BOUNDS.y // CHUNK_W_SIZE.y)
+    ]
+# A chunk around the surface, where the terrain height matters.
+CHUNK_W_POS = WVec(0, 7) * CHUNK_W_SIZE
+
+
+def check_generation(seed):
+    """Check that the generation is reproducible, depends on the seed, and doesn't depend on batching. """
+    generator = WorldGenerator(seed)
+    batch_block_ids = generator.gen_chunks_block_ids(COLUMN_CHUNK_W_POSS)
+    for chunk_w_pos, chunk_block_ids in zip(COLUMN_CHUNK_W_POSS, batch_block_ids):
+        if not np.array_equal(generator.gen_chunk_block_ids(chunk_w_pos), chunk_block_ids):
+            print(f"Generating the chunk at {chunk_w_pos} alone differs from generating it in a batch.")
+            return False
+
+    if not np.array_equal(WorldGenerator(seed).gen_chunks_block_ids(COLUMN_CHUNK_W_POSS), batch_block_ids):
+        print("Generation isn't reproducible with the same seed.")
+        return False
+    if np.array_equal(WorldGenerator(seed + 1).gen_chunks_block_ids(COLUMN_CHUNK_W_POSS), batch_block_ids):
+        print("Generation doesn't depend on the seed.")
+        return False
+
+    if not (batch_block_ids == BlockType.bedrock.id).any() or not (batch_block_ids == BlockType.grass.id).any():
+        print("The column is missing its bedrock or its surface.")
+        return False
+    return True
+
+
+def chunks_per_second(statement, namespace, n_chunks, number=20):
+    timer = Timer(statement, globals=namespace)
+    return number * n_chunks / min(timer.repeat(repeat=3, number=number))
+
+
+def main(seed=0.15681):
+    if not check_generation(seed):
+        sys.exit(1)
+    print("The generation is consistent.")
+
+    noise = PerlinNoise(seed)
+    block_w_xs, block_w_ys = np.meshgrid(np.arange(CHUNK_W_SIZE.x), np.arange(CHUNK_W_SIZE.y))
+    namespace = {
+        "generator": WorldGenerator(seed),
+        "noise": noise,
+        "block_w_xs": block_w_xs / 10,
+        "block_w_ys": block_w_ys / 10,
+        "CHUNK_W_POS": CHUNK_W_POS,
+        "COLUMN_CHUNK_W_POSS": COLUMN_CHUNK_W_POSS,
+        }
+    cases = {
+        "noise3, 5 octaves, 8x8": ("noise.noise3(block_w_xs, block_w_ys, 0.5, octaves=5)", 1),
+        "8x8 chunk": ("generator.gen_chunk_block_ids(CHUNK_W_POS)", 1),
+        "256-tall column": ("generator.gen_chunks_block_ids(COLUMN_CHUNK_W_POSS)", len(COLUMN_CHUNK_W_POSS)),
+        }
+    for name, (statement, n_chunks) in cases.items():
+        throughput = chunks_per_second(statement, namespace, n_chunks)
+        print(f"{name:<24}{throughput:>12.0f} chunks/s{1e6 / throughput:>10.0f} us per chunk")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+"""Golden-output check and benchmark of the sky light solvers of world.lighting, against the former heapq one.
+
+Run from the mineflat dir with: `python -m benchmarks.lighting`
+"""
+import sys
+from heapq import heappush, heappop
+from timeit import Timer
+
+import numpy as np
+
+from core.constants import LIGHT_MAX_LEVEL, LIGHT_BLOCK_ATTENUATION, CHUNK_W_SIZE
+from world.lighting import propagate_sky_light_buckets, propagate_sky_light_relaxation
+
+
+def propagate_sky_light_heapq(sky_light_grid, is_block_grid):
+    """The former solver of Chunk.light, kept as the reference. """
+    n_rows, n_cols = sky_light_grid.shape
+    visited_cells = []
+    cells_priority_queue = []
+    for i, j in zip(*np.nonzero(sky_light_grid > 1)):
+        value = sky_light_grid[i, j]
+        if value == LIGHT_MAX_LEVEL:
+            visited_cells.append((i, j))
+        heappush(cells_priority_queue, (-value, (i, j)))
+
+    while len(cells_priority_queue) > 0:
+        source_value, index = heappop(cells_priority_queue)
+        source_value *= -1
+        visited_cells.append(index)
+        i, j = index
+        for cell_index, is_down in (((i, j + 1), False), ((i - 1, j), False), ((i, j - 1), False), ((i + 1, j), True)):
+            if cell_index in visited_cells:
+                continue
+            if not (0 <= cell_index[0] < n_rows and 0 <= cell_index[1] < n_cols):
+                continue
+            if is_block_grid[index]:
+                cell_value = max(0, source_value - LIGHT_BLOCK_ATTENUATION)
+            elif is_down and source_value == LIGHT_MAX_LEVEL:
+                cell_value = LIGHT_MAX_LEVEL
+            else:
+                cell_value = source_value - 1
+            if cell_value > sky_light_grid[cell_index]:
+                sky_light_grid[cell_index] = cell_value
+                if cell_value > 1:
+                    heappush(cells_priority_queue, (-cell_value, cell_index))
+
+
+SOLVERS = {
+    "heapq": propagate_sky_light_heapq,
+    "buckets": propagate_sky_light_buckets,
+    "relaxation": propagate_sky_light_relaxation,
+    }
+
+
+def gen_cases(n_cases, seed=0):
+    """Return grids like the ones Chunk.light solves: lit borders around an empty interior, and random blocks. """
+    rng = np.random.default_rng(seed)
+    grids_size = (CHUNK_W_SIZE.y + 2, CHUNK_W_SIZE.x + 2)
+    cases = []
+    for case_index in range(n_cases):
+        is_block_grid = rng.random(grids_size) < case_index / n_cases
+        sky_light_grid = rng.integers(0, LIGHT_MAX_LEVEL + 1, grids_size)
+        sky_light_grid[rng.random(grids_size) < 0.5] = 0
+        sky_light_grid[0, :] = rng.choice((0, LIGHT_MAX_LEVEL))
+        sky_light_grid[1:-1, 1:-1] = 0
+        cases.append((sky_light_grid, is_block_grid))
+    return cases
+
+
+def check_golden_output(cases):
+    for case_index, (sky_light_grid, is_block_grid) in enumerate(cases):
+        expected = sky_light_grid.copy()
+        propagate_sky_light_heapq(expected, is_block_grid)
+        for name, solver in SOLVERS.items():
+            result = sky_light_grid.copy()
+            solver(result, is_block_grid)
+            if not np.array_equal(result, expected):
+                print(f"Solver {name} differs from the reference on case {case_index}.")
+                return False
+    return True
+
+
+def main(n_cases=500, number=3):
+    cases = gen_cases(n_cases)
+    if not check_golden_output(cases):
+        sys.exit(1)
+    print(f"All solvers match the reference on {n_cases} grids.")
+
+    reference_time = None
+    for name, solver in SOLVERS.items():
+        timer = Timer(
+            "for sky_light_grid, is_block_grid in cases: solver(sky_light_grid.copy(), is_block_grid)",
+            globals={"cases": cases, "solver": solver},
+            )
+        solver_time = min(timer.repeat(repeat=3, number=number)) / (number * n_cases)
+        reference_time = reference_time or solver_time
+        print(f"{name:<12}{solver_time * 1e6:>10.0f} us per chunk{reference_time / solver_time:>8.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""Micro-benchmark of core.vec.Vec against the NumPy-backed vector it replaced.
+
+Run from the mineflat dir with: `python -m benchmarks.vec`
+"""
+from math import floor
+from timeit import Timer
+
+import numpy as np
+
+from core.classes import WVec
+
+
+class NumpyWVec:
+    """The operations of the former NumPy-backed Vec that show up in the hot paths, kept as a reference. """
+    def __init__(self, x=0.0, y=0.0):
+        if isinstance(x, np.ndarray):
+            self.coords = x
+        else:
+            self.coords = np.array((x, y))
+
+    @property
+    def x(self):
+        return self.coords[0]
+
+    @property
+    def y(self):
+        return self.coords[1]
+
+    def __iter__(self):
+        return iter((self.x, self.y))
+
+    def __hash__(self):
+        return hash(tuple(self))
+
+    def __add__(self, other):
+        if isinstance(other, NumpyWVec):
+            return type(self)(self.coords + other.coords)
+        return type(self)(self.coords + other)
+
+    def __sub__(self, other):
+        if isinstance(other, NumpyWVec):
+            return type(self)(self.coords - other.coords)
+        return type(self)(self.coords - other)
+
+    def __mul__(self, other):
+        if isinstance(other, NumpyWVec):
+            return type(self)(self.coords * other.coords)
+        return type(self)(self.coords * other)
+
+    def __floor__(self):
+        return type(self)(*(floor(coord) for coord in self.coords))
+
+    def __eq__(self, other):
+        return all(self_coord == other_coord for self_coord, other_coord in zip(self, other))
+
+    def norm(self):
+        return np.linalg.norm(self.coords)
+
+
+CASES = {
+    "construct": "vec_type(3, 4)",
+    "add": "a + b",
+    "sub": "a - b",
+    "mul scalar": "a * 2.5",
+    "floor": "floor(f)",
+    "hash": "hash(a)",
+    "eq": "a == b",
+    "norm": "f.norm()",
+    "dict lookup": "a in blocks_map",
+    }
+
+
+def time_case(vec_type, statement, number):
+    namespace = {
+        "floor": floor,
+        "vec_type": vec_type,
+        "a": vec_type(3, 4),
+        "b": vec_type(-1, 2),
+        "f": vec_type(3.7, -4.2),
+        "blocks_map": {vec_type(x, y): None for x in range(8) for y in range(8)},
+        }
+    timer = Timer(statement, globals=namespace)
+    return min(timer.repeat(repeat=5, number=number)) / number
+
+
+def main(number=20000):
+    print(f"{'operation':<14}{'numpy (ns)':>12}{'vec (ns)':>12}{'speedup':>10}")
+    for name, statement in CASES.items():
+        numpy_time = time_case(NumpyWVec, statement, number)
+        vec_time = time_case(WVec, statement, number)
+        print(f"{name:<14}{numpy_time * 1e9:>12.0f}{vec_time * 1e9:>12.0f}{numpy_time / vec_time:>9.1f}x")
+
+
+if __name__ == '__main__':
+    main()
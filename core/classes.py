@@ -1,16 +1,25 @@
 from typing import NamedTuple
-from enum import Enum
+from enum import Enum, IntEnum
 
-from core.vec import Vec
+from core.vec import Vec, IntVec
 
 
-class WVec(Vec): pass
+class WVec(Vec): __slots__ = ()
 
 
-class CVec(Vec): pass
+class WIntVec(IntVec, WVec): __slots__ = ()
 
 
-class PixVec(Vec): pass
+class CVec(Vec): __slots__ = ()
+
+
+class CIntVec(IntVec, CVec): __slots__ = ()
+
+
+class PixVec(Vec): __slots__ = ()
+
+
+class PixIntVec(IntVec, PixVec): __slots__ = ()
 
 
 class WBounds(NamedTuple):
@@ -40,6 +49,13 @@ class LoadResult(Enum):
     incompatible = -2
 
 
+class ChunkStatus(IntEnum):
+    """Stages of the lifecycle of a chunk, in the order they are reached. Each stage is only run once it is needed. """
+    generated = 0  # Its blocks exist, which is enough to light its neighbors.
+    lit = 1  # Its sky light has been computed at least once.
+    rendered = 2  # Its surf has been drawn, which is only needed while it is visible.
+
+
 class DirMeta(type):
     def __iter__(self):
         return iter((self.right, self.up, self.left, self.down))
@@ -53,11 +69,21 @@ class Dir(metaclass=DirMeta):
 
 
 class Colliders:
-    def __init__(self):
-        self.left = []
-        self.right = []
-        self.down = []
-        self.up = []
+    """Boolean masks of the blocks of a chunk having an exposed face in each direction. """
+    def __init__(self, left, right, down, up):
+        self.left = left
+        self.right = right
+        self.down = down
+        self.up = up
+
+    def __getitem__(self, dir_):
+        if dir_ == Dir.left:
+            return self.left
+        if dir_ == Dir.right:
+            return self.right
+        if dir_ == Dir.down:
+            return self.down
+        return self.up
 
     def __repr__(self):
         return f"left: {self.left}, \nright: {self.right}, \ndown: {self.down}, \nup: {self.up}"
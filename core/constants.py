@@ -2,7 +2,7 @@ import os
 
 import pygame as pg
 
-from core.classes import PixVec, WVec, WBounds, Dir
+from core.classes import PixVec, WVec, CVec, WBounds, Dir
 
 # ==== TECHNICAL DIMENSIONS ====
 PLAYER_S_POS = PixVec(0.5, 0.333)
@@ -21,11 +21,19 @@ C_KEY = pg.Color(255, 0, 0)
 C_BLACK = pg.Color(0, 0, 0)
 C_WHITE = pg.Color(255, 255, 255)
 C_SKY = pg.Color(120, 190, 225)
+C_PLACEHOLDER = pg.Color(60, 60, 60)
 
 # ==== CAM ====
 CAM_FPS = 60
 CAM_DEFAULT_SCALE = 64.0
-CAM_SCALE_BOUNDS = (16.0, 128.0)
+CAM_SCALE_BOUNDS = (2.0, 128.0)
+# Levels of detail of the world, as the scale from which each one is used, and the pixel size of its blocks.
+LODS = (
+    (12.0, BLOCK_PIX_SIZE),
+    (6.0, BLOCK_PIX_SIZE // 2),
+    (3.0, BLOCK_PIX_SIZE // 4),
+    (0.0, PixVec(1, 1)),  # The average color of each block.
+    )
 
 # ==== GAME DYNAMICS ====
 GRAVITY = WVec(0.0, -22 / (CAM_FPS ** 2))
@@ -53,6 +61,8 @@ else:
     CHUNK_BORDERS = False
     SAVE = True
     LOAD = True
+AUTOSAVE_DELAY = 60 * CAM_FPS  # In frames.
+JOURNAL_FLUSH_DELAY = CAM_FPS // 2  # In frames, the edits that a crash can lose at most.
 
 # ==== PATHS ====
 CWD = os.getcwd()
@@ -66,7 +76,18 @@ GUI_PATH = os.path.join(RESOURCES_PATH, "gui")
 # ==== LIGHT DYNAMICS ====
 LIGHT_MAX_LEVEL = 15
 LIGHT_BLOCK_ATTENUATION = 5
-LIGHT_MAX_RECURSION = 3
+LIGHT_FRAME_TIME_BUDGET = 0.25 / CAM_FPS  # In seconds, the time spent lighting chunks in a frame.
+
+# ==== CHUNK LOADING ====
+CHUNK_GENERATION_WORKERS = 2
+CHUNK_INTEGRATION_TIME_BUDGET = 0.25 / CAM_FPS  # In seconds, the time spent creating generated chunks in a frame.
+CHUNK_MAX_RESIDENT = 2 ** 10  # Chunks unused for the longest are unloaded beyond this, once saved if modified.
+
+# ==== SAVE FILES ====
+REGION_C_SIZE = CVec(16, 16)  # In chunks.
+REGION_COMPRESSION = True  # Whether chunks are zlib-compressed, when that makes them smaller.
+REGIONS_DIR = "regions"  # In the save dir.
+JOURNAL_DIR = "journal"  # In the save dir.
 
 # ==== UTILITIES ====
 DIR_TO_ANGLE = {
@@ -1,7 +1,9 @@
 from math import floor
 
+import numpy as np
+
 from core.classes import CVec, WVec, PixVec, WBounds
-from core.constants import CHUNK_W_SIZE, BLOCK_PIX_SIZE, LIGHT_MAX_LEVEL
+from core.constants import CHUNK_W_SIZE, BLOCK_PIX_SIZE, LIGHT_MAX_LEVEL, LODS
 
 
 def w_to_c_vec(w_vec: WVec):
@@ -16,6 +18,14 @@ def w_to_c_to_w_vec(w_vec: WVec):
     return floor(w_vec // CHUNK_W_SIZE) * CHUNK_W_SIZE
 
 
+def scale_to_lod_block_pix_size(scale):
+    """Return the pixel size of the blocks of the level of detail used at scale, in pixels per block. """
+    for min_scale, block_pix_size in LODS:
+        if scale >= min_scale:
+            return block_pix_size
+    return LODS[-1][1]
+
+
 def w_to_pix_shift(w_shift: WVec, source_surf_pix_size: PixVec, dest_surf_pix_size: PixVec, source_pivot: PixVec = PixVec(), dest_pivot: PixVec = PixVec(), *, scale=BLOCK_PIX_SIZE.x):
     return PixVec(
         w_shift.x * scale - source_pivot.x + dest_pivot.x,
@@ -38,5 +48,14 @@ def color_float_to_int(color_float):
     return min(floor(color_float * 256), 255)
 
 
+LIGHT_LEVEL_TO_COLOR_INT = tuple(color_float_to_int(light_level / LIGHT_MAX_LEVEL) for light_level in range(LIGHT_MAX_LEVEL + 1))
+
+
 def light_level_to_color_int(light_level):
-    return color_float_to_int(light_level / LIGHT_MAX_LEVEL)
+    return LIGHT_LEVEL_TO_COLOR_INT[light_level]
+
+
+def get_light_level_to_mapped_color(surf):
+    """Return the lookup table from light level to grey pixel value, in the pixel format of surf.
+    """
+    return np.array([surf.map_rgb((value, value, value)) for value in LIGHT_LEVEL_TO_COLOR_INT], dtype=np.int64)
@@ -1,215 +1,173 @@
 from typing import overload
-from math import floor
-from collections.abc import Iterable
+from math import floor, hypot
+from numbers import Integral
+from operator import itemgetter
 
-import numpy as np
+_FAST_TYPES = {int, float}
 
 
-class Vec:
+class Vec(tuple):
+    """Immutable 2D vector.
+
+    Like the NumPy arrays it used to wrap, a vector's coordinates are promoted together: two ints make an integer
+    vector (of the space's IntVec variant), anything else makes a float vector. Being a tuple, it hashes and compares
+    like (x, y), which makes it a cheap dict key.
+    """
+    __slots__ = ()
+
+    _is_int = False
+    _float_variant = None
+    _int_variant = None
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if not cls._is_int:
+            cls._float_variant = cls
+            return
+
+        float_variant = next(base for base in cls.__bases__ if issubclass(base, Vec) and not base._is_int)
+        float_variant._int_variant = cls
+        cls._float_variant = float_variant
+        cls._int_variant = cls
+
     @overload
-    def __init__(self, x: int or float = 0.0, y: int or float = 0.0):
+    def __new__(cls, x: int or float = 0.0, y: int or float = 0.0):
         pass
 
     @overload
-    def __init__(self, vec_like):
+    def __new__(cls, vec_like):
         pass
 
-    def __init__(self, *args, **kwargs):
-        # FIXME: There are still lots of usage patterns which shouldn't be legal but don't throw exceptions.
-        x = None
-        y = None
-        vec_like = None
-        if len(args) > 0:
-            if isinstance(args[0], np.ndarray):
-                vec_like = args[0]
-            elif isinstance(args[0], Vec):
-                vec_like = np.array(args[0].coords)
-            elif isinstance(args[0], Iterable):
-                vec_like = np.array(args[0])
-            else:
-                x = args[0]
-        if len(args) > 1:
-            y = args[1]
-            
-        if x is None:
-            if "x" in kwargs:
-                x = kwargs["x"]
-            else:
-                x = 0.0
-            
-        if y is None:
-            if "y" in kwargs:
-                y = kwargs["y"]
-            else:
-                y = 0.0
-            
-        if vec_like is None and "vec_like" in kwargs:
-            if isinstance(kwargs["vec_like"], np.ndarray):
-                vec_like = kwargs["vec_like"]
-            elif isinstance(kwargs["vec_like"], Vec):
-                vec_like = np.array(kwargs["vec_like"].coords)
-            elif isinstance(kwargs["vec_like"], Iterable):
-                vec_like = np.array(kwargs["vec_like"])
-            
-        if vec_like is None:
-            self.coords = np.array((x, y))
-        else:
-            self.coords = vec_like
+    def __new__(cls, *args, **kwargs):
+        if len(args) == 2 and type(args[0]) in _FAST_TYPES and type(args[1]) in _FAST_TYPES and not cls._is_int:
+            return cls._make(*args)
 
-    @property
-    def x(self):
-        return self.coords[0]
+        if len(args) == 1:
+            x, y = args[0]
+        elif "vec_like" in kwargs:
+            x, y = kwargs["vec_like"]
+        else:
+            x = args[0] if len(args) > 0 else kwargs.get("x", 0.0)
+            y = args[1] if len(args) > 1 else kwargs.get("y", 0.0)
 
-    @property
-    def y(self):
-        return self.coords[1]
+        if isinstance(x, Integral) and isinstance(y, Integral):
+            return tuple.__new__(cls._int_variant, (int(x), int(y)))
+        if cls._is_int:
+            raise TypeError(f"{cls.__name__} coordinates must be integers, got {x!r} and {y!r}.")
+        return tuple.__new__(cls._float_variant, (float(x), float(y)))
 
-    @x.setter
-    def x(self, x):
-        self.coords[0] = x
+    def __getnewargs__(self):
+        return tuple(self),
 
-    @y.setter
-    def y(self, y):
-        self.coords[1] = y
+    @classmethod
+    def _make(cls, x, y):
+        """Fast constructor for results of operations, whose coordinates are known to be numbers. """
+        if type(x) is int and type(y) is int:
+            return tuple.__new__(cls._int_variant, (x, y))
+        return tuple.__new__(cls._float_variant, (float(x), float(y)))
 
-    def __getitem__(self, key):
-        return self.coords[key]
+    x = property(itemgetter(0))
+    y = property(itemgetter(1))
 
-    def __setitem__(self, key, value):
-        self.coords[key] = value
+    def replace(self, x=None, y=None):
+        """Return a copy of the vector with the given coordinates replaced. """
+        return self._make(self[0] if x is None else x, self[1] if y is None else y)
 
     def __repr__(self):
-        return f"{type(self).__name__}(x={self.x}, y={self.y})"
-
-    def __iter__(self):
-        return iter((self.x, self.y))
-
-    def __hash__(self):
-        return hash(tuple(self))
+        return f"{self._float_variant.__name__}(x={self[0]}, y={self[1]})"
 
     def __add__(self, other):
-        if isinstance(other, Vec):
-            return type(self)(self.coords + other.coords)
-        return type(self)(self.coords + other)
+        if isinstance(other, tuple):
+            return self._make(self[0] + other[0], self[1] + other[1])
+        return self._make(self[0] + other, self[1] + other)
 
     def __radd__(self, other):
         return self + other
 
     def __sub__(self, other):
-        if isinstance(other, Vec):
-            return type(self)(self.coords - other.coords)
-        return type(self)(self.coords - other)
+        if isinstance(other, tuple):
+            return self._make(self[0] - other[0], self[1] - other[1])
+        return self._make(self[0] - other, self[1] - other)
 
     def __rsub__(self, other):
         return -self + other
 
     def __mul__(self, other):
-        if isinstance(other, Vec):
-            return type(self)(self.coords * other.coords)
-        return type(self)(self.coords * other)
+        if isinstance(other, tuple):
+            return self._make(self[0] * other[0], self[1] * other[1])
+        return self._make(self[0] * other, self[1] * other)
 
     def __rmul__(self, other):
         return self * other
 
     def __floordiv__(self, other):
-        if isinstance(other, Vec):
-            return type(self)(self.coords // other.coords)
-        return type(self)(self.coords // other)
+        if isinstance(other, tuple):
+            return self._make(self[0] // other[0], self[1] // other[1])
+        return self._make(self[0] // other, self[1] // other)
 
     def __rfloordiv__(self, other):
-        return type(self)(other // self.coords)
+        if isinstance(other, tuple):
+            return self._make(other[0] // self[0], other[1] // self[1])
+        return self._make(other // self[0], other // self[1])
 
     def __truediv__(self, other):
-        if isinstance(other, Vec):
-            return type(self)(self.coords / other.coords)
-        return type(self)(self.coords / other)
+        if isinstance(other, tuple):
+            return self._make(self[0] / other[0], self[1] / other[1])
+        return self._make(self[0] / other, self[1] / other)
 
     def __rtruediv__(self, other):
-        return type(self)(other / self.coords)
+        if isinstance(other, tuple):
+            return self._make(other[0] / self[0], other[1] / self[1])
+        return self._make(other / self[0], other / self[1])
 
     def __pow__(self, other):
-        if isinstance(other, Vec):
-            return type(self)(self.coords ** other.coords)
-        return type(self)(self.coords ** other)
+        if isinstance(other, tuple):
+            return self._make(self[0] ** other[0], self[1] ** other[1])
+        return self._make(self[0] ** other, self[1] ** other)
 
     def __rpow__(self, other):
-        return type(self)(other ** self.coords)
-
-    def __iadd__(self, other):
-        if isinstance(other, Vec):
-            self.coords += other.coords
-        else:
-            self.coords += other
-        return self
-
-    def __isub__(self, other):
-        if isinstance(other, Vec):
-            self.coords -= other.coords
-        else:
-            self.coords -= other
-        return self
-
-    def __imul__(self, other):
-        if isinstance(other, Vec):
-            self.coords *= other.coords
-        else:
-            self.coords *= other
-        return self
-
-    def __ifloordiv__(self, other):
-        if isinstance(other, Vec):
-            self.coords //= other.coords
-        else:
-            self.coords //= other
-        return self
-
-    def __itruediv__(self, other):
-        if isinstance(other, Vec):
-            self.coords /= other.coords
-        else:
-            self.coords /= other
-        return self
-
-    def __ipow__(self, other):
-        if isinstance(other, Vec):
-            self.coords **= other.coords
-        else:
-            self.coords **= other
-        return self
+        if isinstance(other, tuple):
+            return self._make(other[0] ** self[0], other[1] ** self[1])
+        return self._make(other ** self[0], other ** self[1])
 
     def __neg__(self):
-        return type(self)(-self.coords)
+        return self._make(-self[0], -self[1])
 
     def __pos__(self):
         return self
 
     def __abs__(self):
-        return type(self)(abs(self.coords))
+        return self._make(abs(self[0]), abs(self[1]))
 
     def __round__(self, ndigits=0):
-        return type(self)(*(round(coord, ndigits) for coord in self.coords))
+        return self._make(round(self[0], ndigits), round(self[1], ndigits))
 
     def __floor__(self):
-        return type(self)(*(floor(coord) for coord in self.coords))
-
-    def __eq__(self, other):
-        return all(self_coord == other_coord for self_coord, other_coord in zip(self, other))
-
-    def __len__(self):
-        return 2
+        return tuple.__new__(self._int_variant, (floor(self[0]), floor(self[1])))
 
     def norm(self):
-        return np.linalg.norm(self.coords)
+        return hypot(self[0], self[1])
 
     def normalized(self):
         return self / self.norm()
 
     def dir_(self):
-        return floor(self // abs(self))
+        x, y = self
+        return tuple.__new__(self._int_variant, ((x > 0) - (x < 0), (y > 0) - (y < 0)))
 
     def dirs_(self):
-        dir_x = self.dir_()
-        dir_x.y = 0
-        dir_y = self.dir_()
-        dir_y.x = 0
-        return dir_x, dir_y
+        dir_x, dir_y = self.dir_()
+        return self._make(dir_x, 0), self._make(0, dir_y)
+
+
+Vec._float_variant = Vec
+
+
+class IntVec(Vec):
+    """Integer variant of Vec, for positions on a grid (blocks, chunks, pixels). """
+    __slots__ = ()
+
+    _is_int = True
+
+    def __floor__(self):
+        return self
@@ -0,0 +1,81 @@
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
+
+from core.constants import AUTOSAVE_DELAY
+from player.player import Player
+from world.world import World, WorldSnapshot
+
+
+class Autosave:
+    """Save of the world and of a player every AUTOSAVE_DELAY frames, written to the disk from a background thread.
+
+    Taking the snapshot to save is cheap, as only the chunks modified since the last save are copied, so the frame loop
+    never waits for the disk. An autosave that is due while the former one is still being written waits for it to end.
+    """
+    def __init__(self, world: World, player: Player, dir_path):
+        self._world = world
+        self._player = player
+        self._dir_path = dir_path
+
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._future = None
+        self._world_snapshot = None
+        self._frames_remaining = AUTOSAVE_DELAY
+
+        self.n_autosaves = 0
+        self.last_duration = None  # In seconds.
+        self.last_n_bytes = None
+
+    def _write(self, world_snapshot: WorldSnapshot, player_data):
+        start_time = perf_counter()
+        n_bytes = World.write_snapshot(world_snapshot)
+        n_bytes += self._player.write_data(self._dir_path, player_data)
+        return perf_counter() - start_time, n_bytes
+
+    def _end(self):
+        """Take into account the end of the autosave being written, if any. """
+        if self._future is None:
+            return
+
+        try:
+            self.last_duration, self.last_n_bytes = self._future.result()
+        except OSError as e:
+            print(f"Error: autosave failed: {e}")
+            self._world.end_saving(self._world_snapshot, is_written=False)
+        else:
+            self.n_autosaves += 1
+            self._world.end_saving(self._world_snapshot, is_written=True)
+        self._future = None
+        self._world_snapshot = None
+
+    def tick(self):
+        if self._future is not None and self._future.done():
+            self._end()
+
+        if self._frames_remaining > 0:
+            self._frames_remaining -= 1
+            return
+        if self._future is not None:
+            return
+
+        self._frames_remaining = AUTOSAVE_DELAY
+        self._world_snapshot = self._world.snapshot(self._dir_path)
+        self._future = self._executor.submit(self._write, self._world_snapshot, self._player.collect_data())
+
+    def req_autosave(self):
+        """Autosave as soon as possible, rather than after AUTOSAVE_DELAY frames. """
+        self._frames_remaining = 0
+
+    def wait(self):
+        """Wait for the autosave being written, if any, to end. """
+        if self._future is not None:
+            self._future.exception()  # Only waits, errors are handled when ending.
+        self._end()
+
+    def get_debug_info(self):
+        """Return the lines of text describing the state of the autosave in debug mode. """
+        if self.last_duration is None:
+            return [f"autosaves: {self.n_autosaves}"]
+        return [
+            f"autosaves: {self.n_autosaves}, last: {self.last_n_bytes} bytes in {self.last_duration * 1000:.1f} ms",
+            ]
@@ -6,6 +6,7 @@ import pygame as pg
 from core.classes import LoadResult
 from core.constants import DEBUG, PLAYER_DEFAULT_SPAWN_POS, CURRENT_SAVE_PATH, LOAD, SAVE
 from graphics.cursor import CURSOR
+from game.autosave import Autosave
 from game.controls import Controls, Mods
 from graphics.hotbar import Hotbar
 from item.block import BlockType
@@ -51,6 +52,7 @@ class Game:
         self._hotbar = Hotbar()
         self._world = World()
         self._main_player = Player("main_player", spawn_pos=PLAYER_DEFAULT_SPAWN_POS)
+        self._autosave = Autosave(self._world, self._main_player, CURRENT_SAVE_PATH)
 
         self._action = GameAction.play
 
@@ -133,8 +135,11 @@ class Game:
             self._main_player.draw(self._camera, self._world)
             self.draw_gui()
 
+            if SAVE:
+                self._autosave.tick()
+
             if DEBUG:
-                self._camera.draw_debug_info()
+                self._camera.draw_debug_info(self._world.get_debug_info() + self._autosave.get_debug_info())
 
             self._camera.display_flip_and_clock_tick()
 
@@ -161,13 +166,20 @@ class Game:
                 self._action = GameAction.quit_without_saving
                 print("Error: incompatible save file.")
 
+        if SAVE and self._action == GameAction.play:
+            # Edits replayed from the journal are compacted into the save by the first autosave.
+            self._world.start_journal()
+            self._autosave.req_autosave()
+
         self._camera.set_transforms(self._main_player.pos)
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
         if SAVE and not self._action == GameAction.quit_without_saving:
+            self._autosave.wait()
             self._world.save_to_disk(CURRENT_SAVE_PATH)
             self._main_player.save_to_disk(CURRENT_SAVE_PATH)
+            self._world.close_journal()
 
         pg.quit()
 
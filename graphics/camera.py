@@ -5,8 +5,8 @@ from math import floor
 import pygame as pg
 
 from core.classes import WVec, BlockSelection, WBounds, PixVec
-from core.funcs import w_to_pix_shift, pix_to_w_shift, light_level_to_color_int
-from core.constants import BLOCK_PIX_SIZE, PLAYER_S_POS, FULLSCREEN, C_KEY, CAM_FPS, CAM_DEFAULT_SCALE, \
+from core.funcs import w_to_pix_shift, pix_to_w_shift, light_level_to_color_int, scale_to_lod_block_pix_size
+from core.constants import PLAYER_S_POS, FULLSCREEN, C_KEY, CAM_FPS, CAM_DEFAULT_SCALE, \
     CAM_SCALE_BOUNDS, DIR_TO_ANGLE, GUI_PATH, ACTION_MAX_DISTANCE, PIX_ORIGIN, HOTBAR_S_POS
 
 
@@ -42,6 +42,8 @@ class Camera:
 
         # Surfs to reuse
         self._world_max_surf_scaled = pg.Surface((0, 0))
+        self._world_max_surf_scaled_key = None  # Scale and size of the max_surf it holds, None if outdated.
+        self._world_scale = None  # Scale the world was drawn at, at the last frame.
         self._player_surf_scaled = pg.Surface((0, 0))
         self._player_surf_scaled.set_colorkey(C_KEY)
         self._block_selector_surf_scaled = pg.Surface((0, 0))
@@ -77,6 +79,15 @@ class Camera:
         mouse_w_pos = mouse_w_shift + self._pos
         return mouse_w_pos
 
+    @property
+    def vel(self):
+        return self._vel
+
+    @property
+    def lod_block_pix_size(self):
+        """Pixel size of the blocks of the level of detail the world is drawn at, at the current scale. """
+        return scale_to_lod_block_pix_size(self._scale)
+
     @property
     def is_zooming(self):
         return not math.isclose(self._zoom_vel, 1)
@@ -112,22 +123,93 @@ class Camera:
 
     # ==== DRAW ====
 
-    def draw_world(self, max_surf, max_view_pos: WVec):
-        max_surf_scaled_pix_size = floor(PixVec(max_surf.get_size()) * (self._scale / BLOCK_PIX_SIZE))
-        if self._world_max_surf_scaled.get_size() != max_surf_scaled_pix_size:
-            self._world_max_surf_scaled = pg.transform.scale(self._world_max_surf_scaled, max_surf_scaled_pix_size)
-        self._world_max_surf_scaled = pg.transform.scale(max_surf, max_surf_scaled_pix_size, self._world_max_surf_scaled)
+    @staticmethod
+    def _scale_pix_coord(pix_coord, pix_size, scaled_pix_size):
+        """Return the first pixel of a scaled surf coming from the pixel at pix_coord of the surf, or from one after it.
+        """
+        return -(-pix_coord * scaled_pix_size // pix_size)
+
+    @classmethod
+    def _scale_pix_rect(cls, rect: pg.Rect, pix_size: PixVec, scaled_pix_size: PixVec):
+        """Return the rect of a scaled surf whose pixels come from rect, so that scaled rects neither overlap nor leave
+        gaps.
+        """
+        left = cls._scale_pix_coord(rect.left, pix_size.x, scaled_pix_size.x)
+        top = cls._scale_pix_coord(rect.top, pix_size.y, scaled_pix_size.y)
+        return pg.Rect(
+            left,
+            top,
+            cls._scale_pix_coord(rect.right, pix_size.x, scaled_pix_size.x) - left,
+            cls._scale_pix_coord(rect.bottom, pix_size.y, scaled_pix_size.y) - top,
+            )
+
+    @classmethod
+    def _get_on_screen_spans(cls, origin, pix_shift, pix_size, scaled_pix_size, screen_pix_size):
+        """Return the spans of pixels of an axis of a surf wrapping around at origin, which are on screen once scaled
+        and drawn at pix_shift, along with the shift of each one once scaled.
+        """
+        origin_scaled = cls._scale_pix_coord(origin, pix_size, scaled_pix_size)
+        spans = []
+        for start, end, span_pix_shift in (
+                (origin, pix_size, pix_shift - origin_scaled),
+                (0, origin, pix_shift + scaled_pix_size - origin_scaled),
+                ):
+            start = max(start, -span_pix_shift * pix_size // scaled_pix_size)
+            end = min(end, (screen_pix_size - span_pix_shift - 1) * pix_size // scaled_pix_size + 1)
+            if start < end:
+                spans.append((start, end, span_pix_shift))
+        return spans
+
+    def draw_world(self, max_surf, max_view_pos: WVec, max_surf_origin: PixVec, max_surf_dirty_rects):
+        """Draw the on-screen part of the max_surf of the world, whose bottom left corner is at max_view_pos once
+        unwrapped. The max_surf wraps around, its top left corner being at max_surf_origin, so it's drawn in up to
+        four parts.
+        At a stable scale, the max_surf is kept scaled, and only the rects drawn on it since the last frame are scaled
+        again. While zooming, only its on-screen parts are scaled.
+        """
+        max_surf_pix_size = PixVec(max_surf.get_size())
+        max_surf_scaled_pix_size = floor(max_surf_pix_size * (self._scale / self.lod_block_pix_size))
+
+        is_zooming = self._scale != self._world_scale
+        self._world_scale = self._scale
+        if is_zooming:
+            self._world_max_surf_scaled_key = None
+        elif self._world_max_surf_scaled_key != (self._scale, max_surf_pix_size):
+            if self._world_max_surf_scaled.get_size() != max_surf_scaled_pix_size:
+                self._world_max_surf_scaled = pg.transform.scale(self._world_max_surf_scaled, max_surf_scaled_pix_size)
+            self._world_max_surf_scaled = pg.transform.scale(max_surf, max_surf_scaled_pix_size, self._world_max_surf_scaled)
+            self._world_max_surf_scaled_key = (self._scale, max_surf_pix_size)
+        else:
+            for rect in max_surf_dirty_rects:
+                scaled_rect = self._scale_pix_rect(rect, max_surf_pix_size, max_surf_scaled_pix_size)
+                if scaled_rect.width > 0 and scaled_rect.height > 0:
+                    pg.transform.scale(
+                        max_surf.subsurface(rect), scaled_rect.size, self._world_max_surf_scaled.subsurface(scaled_rect))
 
         w_shift = max_view_pos - self._pos
-        pix_shift = w_to_pix_shift(
+        pix_shift = floor(w_to_pix_shift(
             w_shift,
             max_surf_scaled_pix_size,
             self._pix_size,
             dest_pivot=self._pix_size * PLAYER_S_POS,
             scale=self._scale
-            )
-
-        self._screen.blit(self._world_max_surf_scaled, pix_shift)
+            ))
+
+        blit_sequence = []
+        for start_x, end_x, span_pix_shift_x in self._get_on_screen_spans(
+                max_surf_origin.x, pix_shift.x, max_surf_pix_size.x, max_surf_scaled_pix_size.x, self._pix_size.x):
+            for start_y, end_y, span_pix_shift_y in self._get_on_screen_spans(
+                    max_surf_origin.y, pix_shift.y, max_surf_pix_size.y, max_surf_scaled_pix_size.y, self._pix_size.y):
+                area = pg.Rect(start_x, start_y, end_x - start_x, end_y - start_y)
+                scaled_area = self._scale_pix_rect(area, max_surf_pix_size, max_surf_scaled_pix_size)
+                if scaled_area.width == 0 or scaled_area.height == 0:
+                    continue
+                dest = (span_pix_shift_x + scaled_area.x, span_pix_shift_y + scaled_area.y)
+                if is_zooming:
+                    blit_sequence.append((pg.transform.scale(max_surf.subsurface(area), scaled_area.size), dest))
+                else:
+                    blit_sequence.append((self._world_max_surf_scaled, dest, scaled_area))
+        self._screen.blits(blit_sequence, doreturn=False)
 
     def draw_player(self, anim_surf, player_pos: WVec, sky_light):
         anim_surf.draw_and_tick(sky_light)
@@ -189,9 +271,12 @@ class Camera:
     def draw_hotbar(self, surf, pix_shift):
         self._screen.blit(surf, self._pix_size * (1-HOTBAR_S_POS) - pix_shift)
 
-    def draw_debug_info(self):
+    def draw_debug_info(self, lines=()):
         fps_surf = self._font.render(f"{self._clock.get_fps():.1f}", True, (255, 255, 255))
         self._screen.blit(fps_surf, (20, 20))
+        for line_index, line in enumerate(lines, start=1):
+            line_surf = self._font.render(line, True, (255, 255, 255))
+            self._screen.blit(line_surf, (20, 20 + line_index * fps_surf.get_height()))
 
     def display_flip_and_clock_tick(self):
         pg.display.flip()
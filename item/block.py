@@ -2,7 +2,9 @@ import os
 from enum import Enum
 
 import pygame as pg
-from core.constants import BLOCK_PIX_SIZE, TEXTURES_PATH
+import numpy as np
+
+from core.constants import BLOCK_PIX_SIZE, TEXTURES_PATH, C_SKY
 
 
 class BlockType(Enum):
@@ -20,6 +22,19 @@ class BlockType(Enum):
 
     bedrock = "7"
 
+    @property
+    def id(self):
+        """Numeric id of the block type, as stored in the chunks' block id grids. """
+        return int(self.value)
+
+    @classmethod
+    def from_id(cls, block_id):
+        return cls(str(block_id))
+
+
+AIR_ID = BlockType.air.id
+BLOCK_ID_DTYPE = np.uint8
+
 
 class Block:
     _BLOCK_DIR = "block"
@@ -44,6 +59,15 @@ class Block:
         self.surf = pg.Surface(self._pix_size)
         self._draw()
 
+    @classmethod
+    def from_id(cls, block_id):
+        """Return the Block of the given block id, without reloading its texture if it has already been loaded. """
+        block_type = BlockType.from_id(block_id)
+        try:
+            return cls._blocks[block_type]
+        except KeyError:
+            return cls(block_type)
+
     def _draw(self):
         if (name := self.block_type.name) in self._special_file_names:
             file_name = self._special_file_names[name]
@@ -54,3 +78,25 @@ class Block:
 
     def __repr__(self):
         return f"{type(self).__name__}({self.block_type})"
+
+
+def get_block_id_to_mapped_texture(surf, block_pix_size=BLOCK_PIX_SIZE):
+    """Return the texture atlas of the blocks, reduced to block_pix_size, in the pixel format of surf.
+    It is indexed by block id, then by (x, y) like surfarrays. Air, and ids without a block type, are the sky's color.
+    Each pixel of a reduced texture is the average color of the texels it covers, down to a single pixel per block.
+    """
+    max_block_id = max(block_type.id for block_type in BlockType)
+    atlas = np.empty((max_block_id + 1, *BLOCK_PIX_SIZE, 3), dtype=np.uint8)
+    atlas[...] = C_SKY[:3]
+    for block_type in BlockType:
+        if block_type.id != AIR_ID:
+            atlas[block_type.id] = pg.surfarray.array3d(Block.from_id(block_type.id).surf)
+
+    if block_pix_size != BLOCK_PIX_SIZE:
+        texels_per_pix = BLOCK_PIX_SIZE // block_pix_size
+        atlas = atlas.reshape(
+            max_block_id + 1, block_pix_size.x, texels_per_pix.x, block_pix_size.y, texels_per_pix.y, 3,
+            ).mean(axis=(2, 4)).round().astype(np.uint8)
+
+    mapped_atlas = pg.surfarray.map_array(surf, atlas.reshape(-1, block_pix_size.y, 3))
+    return mapped_atlas.reshape(max_block_id + 1, *block_pix_size)
@@ -6,7 +6,8 @@ from core.constants import CAM_FPS, PLAYER_POS_DAMPING_FACTOR, GRAVITY, PLAYER_P
     BLOCK_BOUND_SHIFTS, PLAYER_ABILITY_FACTOR
 from core.funcs import get_bounds
 from graphics.animated_surface import AnimAction, AnimatedSurface
-from core.classes import WVec, WBounds, LoadResult
+from core.classes import WVec, WBounds, LoadResult, Dir
+from utils.save_utils import write_json_atomically
 
 
 class Player:
@@ -68,9 +69,7 @@ class Player:
     def action_w_pos(self):
         """Getter for the position from which the player acts upon its environment.
         """
-        action_w_pos = WVec(self.pos)
-        action_w_pos.y += self._w_size.y * self._ACTION_POS_RATIO
-        return action_w_pos
+        return self.pos + WVec(0.0, self._w_size.y * self._ACTION_POS_RATIO)
 
     # ==== DRAW ====
 
@@ -85,44 +84,44 @@ class Player:
         self._anim_surf = self._anim_surf_walking
         self._anim_surf.action = AnimAction.play
         self._anim_surf.is_flipped = False
-        self._req_vel.x = self._walking_speed
+        self._req_vel = self._req_vel.replace(x=self._walking_speed)
 
     def req_move_left(self):
         self._anim_surf_walking.sync(self._anim_surf)
         self._anim_surf = self._anim_surf_walking
         self._anim_surf.action = AnimAction.play
         self._anim_surf.is_flipped = True
-        self._req_vel.x = -self._walking_speed
+        self._req_vel = self._req_vel.replace(x=-self._walking_speed)
 
     def req_sprint_right(self):
         self._anim_surf_sprinting.sync(self._anim_surf)
         self._anim_surf = self._anim_surf_sprinting
         self._anim_surf.action = AnimAction.play
         self._anim_surf.is_flipped = False
-        self._req_vel.x = self._sprinting_speed
+        self._req_vel = self._req_vel.replace(x=self._sprinting_speed)
 
     def req_sprint_left(self):
         self._anim_surf_sprinting.sync(self._anim_surf)
         self._anim_surf = self._anim_surf_sprinting
         self._anim_surf.action = AnimAction.play
         self._anim_surf.is_flipped = True
-        self._req_vel.x = -self._sprinting_speed
+        self._req_vel = self._req_vel.replace(x=-self._sprinting_speed)
 
     def req_h_move_stop(self):
         self._anim_surf.action = AnimAction.end
-        self._req_vel.x = 0
+        self._req_vel = self._req_vel.replace(x=0)
 
     def req_v_move_stop(self):
-        self._req_vel.y = 0
+        self._req_vel = self._req_vel.replace(y=0)
 
     def req_jump(self):
         if self._is_on_ground:
-            self._req_vel.y = self._jumping_speed
+            self._req_vel = self._req_vel.replace(y=self._jumping_speed)
         else:
             self.req_jump_stop()
 
     def req_jump_stop(self):
-        self._req_vel.y = 0
+        self._req_vel = self._req_vel.replace(y=0)
 
     # ==== APPLY MOVEMENTS ====
 
@@ -143,8 +142,6 @@ class Player:
     def _collide(self, world, threshold=0.001):
         """Check for collisions with the world and update the transforms accordingly.
         """
-        world_colliders = world.get_colliders_around(self.pos, c_radius=1)
-
         tested_horiz_pos = (self._req_pos.x, self.pos.y)
         tested_horiz_pos_bounds = self.get_bounds(tested_horiz_pos)
 
@@ -154,39 +151,49 @@ class Player:
         for pos_x in range(tested_vert_pos_bounds.min.x, tested_vert_pos_bounds.max.x+1):
             if self._vel.y < 0:
                 pos_y = tested_vert_pos_bounds.min.y
-                if (pos_x, pos_y) in world_colliders.up:
-                    self._req_pos.y = pos_y + BLOCK_BOUND_SHIFTS.max.y - self._bounds_w_shift.min.y + threshold
-                    self._vel.y = 0
+                if world.has_collider(WVec(pos_x, pos_y), Dir.up):
+                    self._req_pos = self._req_pos.replace(
+                        y=pos_y + BLOCK_BOUND_SHIFTS.max.y - self._bounds_w_shift.min.y + threshold
+                        )
+                    self._vel = self._vel.replace(y=0)
                     self._is_on_ground = True
                     break
 
             else:
                 pos_y = tested_vert_pos_bounds.max.y
-                if (pos_x, pos_y) in world_colliders.down:
-                    self._req_pos.y = pos_y + BLOCK_BOUND_SHIFTS.min.y - self._bounds_w_shift.max.y - threshold
-                    self._vel.y = 0
+                if world.has_collider(WVec(pos_x, pos_y), Dir.down):
+                    self._req_pos = self._req_pos.replace(
+                        y=pos_y + BLOCK_BOUND_SHIFTS.min.y - self._bounds_w_shift.max.y - threshold
+                        )
+                    self._vel = self._vel.replace(y=0)
                     break
 
         for pos_y in range(tested_horiz_pos_bounds.min.y, tested_horiz_pos_bounds.max.y+1):
             if self._vel.x <= 0:
                 pos_x = tested_horiz_pos_bounds.min.x
-                if (pos_x, pos_y) in world_colliders.right:
-                    self._req_pos.x = pos_x + BLOCK_BOUND_SHIFTS.max.x - self._bounds_w_shift.min.x + threshold
-                    self._vel.x = 0
+                if world.has_collider(WVec(pos_x, pos_y), Dir.right):
+                    self._req_pos = self._req_pos.replace(
+                        x=pos_x + BLOCK_BOUND_SHIFTS.max.x - self._bounds_w_shift.min.x + threshold
+                        )
+                    self._vel = self._vel.replace(x=0)
                     break
 
             else:
                 pos_x = tested_horiz_pos_bounds.max.x
-                if (pos_x, pos_y) in world_colliders.left:
-                    self._req_pos.x = pos_x + BLOCK_BOUND_SHIFTS.min.x - self._bounds_w_shift.max.x - threshold
-                    self._vel.x = 0
+                if world.has_collider(WVec(pos_x, pos_y), Dir.left):
+                    self._req_pos = self._req_pos.replace(
+                        x=pos_x + BLOCK_BOUND_SHIFTS.min.x - self._bounds_w_shift.max.x - threshold
+                        )
+                    self._vel = self._vel.replace(x=0)
                     break
 
     def move(self, world, substeps=1):
         """Apply requested and physics-induced movements.
         """
-        self._vel.x += (self._req_vel.x - self._vel.x) * PLAYER_POS_DAMPING_FACTOR
-        self._vel.y += self._req_vel.y
+        self._vel = WVec(
+            self._vel.x + (self._req_vel.x - self._vel.x) * PLAYER_POS_DAMPING_FACTOR,
+            self._vel.y + self._req_vel.y,
+            )
 
         self._vel += self._ACC
 
@@ -196,7 +203,7 @@ class Player:
         for _ in range(collision_steps):
             self._req_pos = self.pos + self._vel / collision_steps
             self._collide(world)
-            self.pos = WVec(self._req_pos)
+            self.pos = self._req_pos
 
     # ==== SAVE AND LOAD ====
 
@@ -212,12 +219,18 @@ class Player:
         self._anim_surf.is_flipped = data["is_reversed"]
         return LoadResult.success
 
-    def save_to_disk(self, dir_path):
-        data = {
+    def collect_data(self):
+        """Return all the data necessary to recreate the player's current state. """
+        return {
             "pos": tuple(self.pos),
             "vel": tuple(self._vel),
             "is_on_ground": self._is_on_ground,
             "is_reversed": self._anim_surf.is_flipped,
             }
-        with open(os.path.join(dir_path, f"{self.name}.json"), "w") as file:
-            json.dump(data, file, indent=4)
+
+    def write_data(self, dir_path, data):
+        """Write data collected from the player to dir_path, and return the number of bytes written. """
+        return write_json_atomically(os.path.join(dir_path, f"{self.name}.json"), data)
+
+    def save_to_disk(self, dir_path):
+        self.write_data(dir_path, self.collect_data())
@@ -0,0 +1,82 @@
+"""One-shot conversion of a save from the former world.json format, which held every block of the world, to region files.
+
+Saves are converted automatically when loaded, but can also be converted from the mineflat dir with:
+`python -m utils.convert_save <save dir>`
+"""
+import json
+import os
+import re
+import sys
+
+import numpy as np
+
+from core.classes import WVec
+from core.constants import CHUNK_W_SIZE, REGION_C_SIZE, REGIONS_DIR
+from item.block import BlockType, AIR_ID, BLOCK_ID_DTYPE
+from world.region import write_regions
+
+WORLD_FILE_NAME = "world.json"
+
+# The former format stores the str() of positions and block types, which are parsed rather than evaluated.
+_W_VEC_PATTERN = re.compile(r"WVec\(x=(-?\d+)(?:\.0*)?, y=(-?\d+)(?:\.0*)?\)")
+_BLOCK_TYPE_PREFIX = "BlockType."
+
+
+def _parse_former_w_vec(w_vec_str):
+    match = _W_VEC_PATTERN.fullmatch(w_vec_str)
+    if match is None:
+        raise ValueError(f"Invalid position in the former world file: {w_vec_str!r}")
+    return WVec(int(match[1]), int(match[2]))
+
+
+def _parse_former_block_type(block_type_str):
+    if not block_type_str.startswith(_BLOCK_TYPE_PREFIX):
+        raise ValueError(f"Invalid block type in the former world file: {block_type_str!r}")
+    try:
+        return BlockType[block_type_str[len(_BLOCK_TYPE_PREFIX):]]
+    except KeyError:
+        raise ValueError(f"Unknown block type in the former world file: {block_type_str!r}") from None
+
+
+def _parse_former_chunks_data(chunks_data):
+    """Return the block ids of the chunks of chunks_data, mapped by chunk_w_pos. """
+    block_ids_map = {}
+    for chunk_w_pos_str, blocks_data_str in chunks_data.items():
+        chunk_w_pos = _parse_former_w_vec(chunk_w_pos_str)
+        block_ids = np.full((CHUNK_W_SIZE.y, CHUNK_W_SIZE.x), AIR_ID, dtype=BLOCK_ID_DTYPE)
+        for block_w_pos_str, block_type_str in blocks_data_str.items():
+            block_w_pos = _parse_former_w_vec(block_w_pos_str)
+            block_type = _parse_former_block_type(block_type_str)
+            block_ids[CHUNK_W_SIZE.y - 1 - (block_w_pos.y - chunk_w_pos.y), block_w_pos.x - chunk_w_pos.x] = block_type.id
+        block_ids_map[chunk_w_pos] = block_ids
+    return block_ids_map
+
+
+def convert_save(dir_path):
+    """Convert the save of dir_path to region files, if it is in the former format, and return whether it was.
+    """
+    world_file_path = os.path.join(dir_path, WORLD_FILE_NAME)
+    with open(world_file_path) as file:
+        data = json.load(file)
+    if "chunks_data" not in data:
+        return False
+
+    write_regions(os.path.join(dir_path, REGIONS_DIR), _parse_former_chunks_data(data.pop("chunks_data")))
+    data["region_c_size"] = tuple(int(x) for x in REGION_C_SIZE)
+
+    os.replace(world_file_path, world_file_path + ".bak")
+    with open(world_file_path, "w") as file:
+        json.dump(data, file, indent=4)
+    return True
+
+
+def main():
+    for dir_path in sys.argv[1:]:
+        if convert_save(dir_path):
+            print(f"Converted {dir_path}, the former world file is kept as {WORLD_FILE_NAME}.bak")
+        else:
+            print(f"{dir_path} is already in the region format.")
+
+
+if __name__ == '__main__':
+    main()
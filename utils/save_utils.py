@@ -0,0 +1,15 @@
+import json
+import os
+
+
+def write_json_atomically(path, data):
+    """Write data as JSON to path, and return the number of bytes written.
+    The data is written to a temporary file first, which then replaces the file at once, so that a save interrupted
+    midway, by a crash for instance, leaves the former file intact.
+    """
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as file:
+        json.dump(data, file, indent=4)
+        n_bytes = file.tell()
+    os.replace(tmp_path, path)
+    return n_bytes
@@ -1,55 +1,63 @@
-from heapq import heappush, heappop
+from collections.abc import Mapping
 from math import floor
 
 import pygame as pg
 import numpy as np
 
-from core.funcs import w_to_pix_shift, light_level_to_color_int
-from core.constants import BLOCK_PIX_SIZE, CHUNK_W_SIZE, CHUNK_PIX_SIZE, C_SKY, LIGHT_MAX_LEVEL, \
-    LIGHT_BLOCK_ATTENUATION, C_BLACK, C_WHITE, WHITE_WORLD, PIX_ORIGIN, CHUNK_BORDERS
-from core.classes import WVec, Colliders, Result, Dir
+from core.funcs import get_light_level_to_mapped_color, light_level_to_color_int
+from core.constants import BLOCK_PIX_SIZE, CHUNK_W_SIZE, CHUNK_PIX_SIZE, LIGHT_MAX_LEVEL, C_BLACK, C_WHITE, \
+    WHITE_WORLD, PIX_ORIGIN, CHUNK_BORDERS
+from core.classes import WVec, Colliders, Result, Dir, ChunkStatus
 from world.generation import WorldGenerator
-from item.block import BlockType, Block
+from world.lighting import propagate_sky_light_buckets
+from item.block import BlockType, Block, AIR_ID, BLOCK_ID_DTYPE, get_block_id_to_mapped_texture
 
 
 class Chunk:
-    _empty_block_surf = pg.Surface(BLOCK_PIX_SIZE)
-    _empty_block_surf.fill(C_SKY)
+    """Square of CHUNK_W_SIZE blocks, going through the stages of ChunkStatus lazily.
+
+    Creating a chunk only sets its blocks and light grids up. Its colliders are built the first time physics needs
+    them, and its surfs are created and drawn the first time it is drawn, which only happens while it is visible.
+    Surfs are drawn at the level of detail they are requested at, and created again when it changes.
+    """
     _GRIDS_SIZE = CHUNK_W_SIZE + 2
+    _light_level_to_mapped_color = None  # Lookup table computed for the pixel format of the first chunk's surfaces.
+    _block_id_to_mapped_textures = {}  # Texture atlas of each level of detail, by block_pix_size, idem.
+
+    needs_promotion = False  # Only uniform chunks ever need to be promoted to full chunks.
 
     # Debug elements:
     _border_rect = pg.Rect(PIX_ORIGIN, CHUNK_PIX_SIZE)
     _white_surf = pg.Surface(CHUNK_PIX_SIZE)
     _white_surf.fill(C_WHITE)
 
-    def __init__(self, w_pos: WVec, seed, blocks_map=None):
+    def __init__(self, w_pos: WVec, generator: WorldGenerator, blocks_map=None, block_ids=None):
         self._w_pos = w_pos
 
-        self._seed = seed
-        self._generator = WorldGenerator(self._seed)
-        if blocks_map is None:
-            self.blocks_map = self._generator.gen_chunk_blocks(self._w_pos)
+        self._generator = generator
+        if blocks_map is not None:
+            self._block_ids = self._blocks_map_to_block_ids(blocks_map)
+        elif block_ids is not None:
+            self._block_ids = block_ids
         else:
-            self.blocks_map = self._generator.load_chunk_blocks(blocks_map)
+            self._block_ids = self._generator.gen_chunk_block_ids(self._w_pos)
+        self.blocks_map = ChunkBlocksMap(self)
 
         self._is_block_grid = np.ones(self._GRIDS_SIZE, dtype=bool)
         self._is_block_grid[0, 1:-1] = False
         self._update_is_block_grid()
 
         self._sky_light_grid = np.zeros(self._GRIDS_SIZE, dtype=int)
-        self._sky_light_surf = pg.Surface(CHUNK_W_SIZE)
-        self._sky_light_surf_array = pg.surfarray.pixels2d(self._sky_light_surf)
-        self._scaled_sky_light_surf = pg.Surface(CHUNK_PIX_SIZE)
-
         self._has_been_highest_lit = False
 
-        self._blocks_surf = pg.Surface(CHUNK_PIX_SIZE)
-        self._draw_blocks_surf()
+        self.surf = None
+        self._dirty_rect = None
+        self._block_pix_size = None  # Of the level of detail the surfs are drawn at.
 
-        self.surf = pg.Surface(CHUNK_PIX_SIZE)
+        self._colliders = None
 
-        self.colliders = Colliders()
-        self._update_colliders()
+        self.status = ChunkStatus.generated
+        self.is_modified = False  # Whether its blocks differ from the generated ones, and can't be generated again.
 
     # ==== GET DATA ====
 
@@ -106,81 +114,155 @@ class Chunk:
         j = x + 1
         return i, j
 
+    def _block_w_pos_to_block_index(self, block_w_pos: WVec):
+        """Return the index of block_w_pos in _block_ids, or None if it is outside of the chunk. """
+        i, j = self.block_w_pos_to_cell_index(block_w_pos)
+        if not (1 <= i <= CHUNK_W_SIZE.y and 1 <= j <= CHUNK_W_SIZE.x):
+            return None
+        return i - 1, j - 1
+
     def _block_w_pos_to_w_shift(self, block_w_pos: WVec):
         return block_w_pos - self._w_pos
 
     def _w_shift_to_block_w_pos(self, block_w_pos: WVec):
         return block_w_pos + self._w_pos
 
-    def _block_w_pos_to_pix_shift(self, block_w_pos: WVec):
-        w_shift = self._block_w_pos_to_w_shift(block_w_pos)
-        return w_to_pix_shift(w_shift, BLOCK_PIX_SIZE, CHUNK_PIX_SIZE)
-
     def get_sky_light_at_w_pos(self, w_pos: WVec):
         index = self.block_w_pos_to_cell_index(floor(w_pos))
         return self._sky_light_grid[index]
 
+    def get_sky_light_grids(self):
+        """Return views of the sky light grid and of the is_block grid restricted to the chunk's own cells.
+        """
+        return self._sky_light_grid[1:-1, 1:-1], self._is_block_grid[1:-1, 1:-1]
+
+    @property
+    def colliders(self):
+        """The colliders of the chunk, built the first time they are needed. """
+        if self._colliders is None:
+            self._colliders = Colliders(*(np.zeros_like(self._block_ids, dtype=bool) for _ in range(4)))
+            self._update_colliders()
+        return self._colliders
+
+    def has_collider(self, block_w_pos: WVec, dir_):
+        """Return whether the block at block_w_pos has an exposed face in dir_. """
+        return self.colliders[dir_][self._block_w_pos_to_block_index(block_w_pos)]
+
+    def get_block_id_at_w_pos(self, block_w_pos: WVec):
+        """Return the id of the block at block_w_pos, or None if block_w_pos is outside of the chunk. """
+        index = self._block_w_pos_to_block_index(block_w_pos)
+        if index is None:
+            return None
+        return self._block_ids[index]
+
+    def block_w_poss_and_ids(self):
+        """Return the positions of the chunk's blocks, and their ids. """
+        i, j = np.nonzero(self._block_ids != AIR_ID)
+        block_ids = self._block_ids[i, j]
+        xs = j + self._w_pos.x
+        ys = CHUNK_W_SIZE.y - 1 - i + self._w_pos.y
+        return [WVec(x, y) for x, y in zip(xs.tolist(), ys.tolist())], block_ids.tolist()
+
     # ==== GENERATE AND DRAW ====
 
+    def _blocks_map_to_block_ids(self, blocks_map):
+        block_ids = np.full((CHUNK_W_SIZE.y, CHUNK_W_SIZE.x), AIR_ID, dtype=BLOCK_ID_DTYPE)
+        for block_w_pos, block_type in blocks_map.items():
+            block_ids[self._block_w_pos_to_block_index(block_w_pos)] = block_type.id
+        return block_ids
+
     def _update_is_block_grid(self):
-        self._is_block_grid[1:-1, 1:-1] = False
-        for block_w_pos in self.blocks_map:
-            self._is_block_grid[self.block_w_pos_to_cell_index(block_w_pos)] = True
-
-    def _update_colliders(self):
-        self.colliders = Colliders()
-        for block_w_pos in self.blocks_map:
-            if not (block_w_pos + WVec(-1, 0)) in self.blocks_map:
-                self.colliders.left.append(block_w_pos)
-            if not (block_w_pos + WVec(+1, 0)) in self.blocks_map:
-                self.colliders.right.append(block_w_pos)
-            if not (block_w_pos + WVec(0, -1)) in self.blocks_map:
-                self.colliders.down.append(block_w_pos)
-            if not (block_w_pos + WVec(0, +1)) in self.blocks_map:
-                self.colliders.up.append(block_w_pos)
+        self._is_block_grid[1:-1, 1:-1] = self._block_ids != AIR_ID
 
-    def _draw_blocks_surf(self):
-        """Draw the blocks, unlit.
+    def _update_is_block_cell(self, block_w_pos: WVec):
+        cell_index = self.block_w_pos_to_cell_index(block_w_pos)
+        self._is_block_grid[cell_index] = self._block_ids[cell_index[0] - 1, cell_index[1] - 1] != AIR_ID
+
+    def _get_own_is_block_grid(self):
+        """Return a copy of _is_block_grid with an empty padding.
+        The padding of _is_block_grid holds the neighbors' blocks, which the colliders of the chunk don't account for.
         """
-        self._blocks_surf.fill(C_SKY)
-        blit_sequence = []
-        for block_w_pos, block in self.blocks_map.items():
-            pix_shift = self._block_w_pos_to_pix_shift(block_w_pos)
-            blit_sequence.append((block.surf, pix_shift))
-        self._blocks_surf.blits(blit_sequence, doreturn=False)
+        is_block_grid = np.zeros(self._GRIDS_SIZE, dtype=bool)
+        is_block_grid[1:-1, 1:-1] = self._block_ids != AIR_ID
+        return is_block_grid
 
-    def _apply_sky_light_grid(self):
-        with np.nditer(self._sky_light_surf_array, flags=["multi_index"], op_flags=["writeonly"]) as it:
-            for cell in it:
-                value = light_level_to_color_int(self._sky_light_grid[it.multi_index[1] + 1, it.multi_index[0] + 1])
-                cell[...] = self._sky_light_surf.map_rgb((value, value, value))
+    def _update_colliders(self, i_slice=slice(0, CHUNK_W_SIZE.y), j_slice=slice(0, CHUNK_W_SIZE.x)):
+        """Update the colliders, which are the faces of the blocks that aren't covered by another block of the chunk.
+        Only the colliders of the blocks in the given slices of _block_ids are updated.
+        """
+        is_block_grid = self._get_own_is_block_grid()
+        i_start, i_stop = i_slice.start + 1, i_slice.stop + 1
+        j_start, j_stop = j_slice.start + 1, j_slice.stop + 1
+        is_block = is_block_grid[i_start:i_stop, j_start:j_stop]
+        self.colliders.left[i_slice, j_slice] = is_block & ~is_block_grid[i_start:i_stop, j_start-1:j_stop-1]
+        self.colliders.right[i_slice, j_slice] = is_block & ~is_block_grid[i_start:i_stop, j_start+1:j_stop+1]
+        self.colliders.down[i_slice, j_slice] = is_block & ~is_block_grid[i_start+1:i_stop+1, j_start:j_stop]
+        self.colliders.up[i_slice, j_slice] = is_block & ~is_block_grid[i_start-1:i_stop-1, j_start:j_stop]
+
+    def _update_colliders_around(self, block_w_pos: WVec):
+        """Update the colliders of the block at block_w_pos and of its neighbors in the chunk only, if they are built.
+        """
+        if self._colliders is None:
+            return
 
-    def light(self, neigh_sky_light_data: dict):
-        """Light the chunk and return the dirs to the chunks that need updating.
+        i, j = self._block_w_pos_to_block_index(block_w_pos)
+        self._update_colliders(
+            slice(max(i - 1, 0), min(i + 2, CHUNK_W_SIZE.y)),
+            slice(max(j - 1, 0), min(j + 2, CHUNK_W_SIZE.x)),
+            )
+
+    @classmethod
+    def _get_block_id_to_mapped_texture(cls, block_pix_size, surf):
+        """Return the texture atlas of the level of detail of block_pix_size, computed for the pixel format of surf the
+        first time.
         """
+        try:
+            return cls._block_id_to_mapped_textures[block_pix_size]
+        except KeyError:
+            pass
+
+        block_id_to_mapped_texture = get_block_id_to_mapped_texture(surf, block_pix_size)
+        cls._block_id_to_mapped_textures[block_pix_size] = block_id_to_mapped_texture
+        return block_id_to_mapped_texture
+
+    def _render(self, block_pix_size):
+        """Create the surfs of the chunk at the level of detail of block_pix_size, and draw them for the first time,
+        with the light it has so far.
+        """
+        chunk_pix_size = block_pix_size * CHUNK_W_SIZE
+        self._block_pix_size = block_pix_size
 
-        def cell_neigh_index_gen(ij):
-            visited_cells.append(ij)
+        self._sky_light_surf = pg.Surface(CHUNK_W_SIZE)
+        self._sky_light_surf_array = pg.surfarray.pixels2d(self._sky_light_surf)
+        if Chunk._light_level_to_mapped_color is None:
+            Chunk._light_level_to_mapped_color = get_light_level_to_mapped_color(self._sky_light_surf)
+        self._scaled_sky_light_surf = pg.Surface(chunk_pix_size)
 
-            i, j = ij
-            candidates = (
-                ((i, j + 1), Dir.right),
-                ((i - 1, j), Dir.up),
-                ((i, j - 1), Dir.left),
-                ((i + 1, j), Dir.down),
-                )
+        self._blocks_surf = pg.Surface(chunk_pix_size)
+        self._block_id_to_mapped_texture = self._get_block_id_to_mapped_texture(block_pix_size, self._blocks_surf)
+        self._draw_blocks_surf()
+        self._apply_sky_light_grid()
 
-            for candidate in candidates:
-                if candidate[0] in visited_cells:
-                    continue
-                if not (0 <= candidate[0][0] < self._GRIDS_SIZE.y
-                        and 0 <= candidate[0][1] < self._GRIDS_SIZE.x):
-                    continue
+        self.surf = pg.Surface(chunk_pix_size)
+        self._dirty_rect = self.surf.get_rect()
+        self.status = ChunkStatus.rendered
 
-                yield candidate
+    def _draw_blocks_surf(self):
+        """Draw the blocks, unlit, by gathering their textures from the atlas all at once.
+        """
+        # Textures are indexed by (i, j, x, y), and need to end up side by side in a surf array indexed by (x, y).
+        textures = self._block_id_to_mapped_texture[self._block_ids]
+        pg.surfarray.blit_array(
+            self._blocks_surf, textures.transpose(1, 2, 0, 3).reshape(self._block_pix_size * CHUNK_W_SIZE))
 
-        visited_cells = []
-        cells_priority_queue = []
+    def _apply_sky_light_grid(self):
+        # The surf array is indexed by (x, y), hence the transposition of the grid.
+        self._sky_light_surf_array[...] = self._light_level_to_mapped_color[self._sky_light_grid[1:-1, 1:-1].T]
+
+    def light(self, neigh_sky_light_data: dict, is_above_surface=False):
+        """Light the chunk and return the dirs to the chunks that need updating.
+        If the chunk is above the highest block of each of its columns, it is lit by the sky without propagating light.
+        """
         neighbors_to_update = set()
 
         ignore_neighbors = False
@@ -206,12 +288,9 @@ class Chunk:
 
                 self._sky_light_grid[index_out] = value
                 self._is_block_grid[index_out] = is_block
-                if value == LIGHT_MAX_LEVEL:
-                    visited_cells.append(index_out)
-                if value > 1:
-                    heappush(cells_priority_queue, (-value, index_out))
 
         # Emptying old light
+        old_sky_light_grid = self._sky_light_grid[1:-1, 1:-1].copy()
         self._sky_light_grid[1:-1, 1:-1].fill(0)
         self._sky_light_grid[0, 0] = 0
         self._sky_light_grid[0, -1] = 0
@@ -219,22 +298,10 @@ class Chunk:
         self._sky_light_grid[-1, 0] = 0
 
         # Computing lighting
-        while len(cells_priority_queue) > 0:
-            source_value, index = heappop(cells_priority_queue)
-            source_value *= -1
-
-            for cell_index, dir_ in cell_neigh_index_gen(index):
-                # Computing light value in cell
-                if self._is_block_grid[index]:
-                    cell_value = max(0, source_value - LIGHT_BLOCK_ATTENUATION)
-                elif dir_ == Dir.down and source_value == LIGHT_MAX_LEVEL:
-                    cell_value = LIGHT_MAX_LEVEL
-                else:
-                    cell_value = source_value - 1
-                if cell_value > self._sky_light_grid[cell_index]:
-                    self._sky_light_grid[cell_index] = cell_value
-                    if cell_value > 1:
-                        heappush(cells_priority_queue, (-cell_value, cell_index))
+        if is_above_surface:
+            self._fill_sky_light_above_surface()
+        else:
+            propagate_sky_light_buckets(self._sky_light_grid, self._is_block_grid)
 
         for dir_ in neigh_sky_light_data:
             for neigh_index, (_, index_out) in enumerate(self._border_indices_gen(dir_)):
@@ -242,42 +309,122 @@ class Chunk:
                 if neigh_sky_light[neigh_index] != self._sky_light_grid[index_out]:
                     neighbors_to_update.add(dir_)
 
-        self._apply_sky_light_grid()
+        self.apply_sky_light_changes(old_sky_light_grid != self._sky_light_grid[1:-1, 1:-1])
+        self.status = max(self.status, ChunkStatus.lit)
 
         return neighbors_to_update
 
-    def draw(self):
-        """Update lighting and draw the chunk's surf.
+    def _fill_sky_light_above_surface(self):
+        """Light the chunk, made only of air under the open sky, like propagate_sky_light_buckets would.
+        """
+        grid = self._sky_light_grid
+        grid[1:-1, 1:-1] = LIGHT_MAX_LEVEL
+
+        # Borders get what the chunk sends them: faded light sideways and up, and full light down.
+        np.maximum(grid[0, 1:-1], LIGHT_MAX_LEVEL - 1, out=grid[0, 1:-1])
+        grid[-1, 1:-1] = LIGHT_MAX_LEVEL
+        # Full light coming down the side borders doesn't fade either.
+        for j in (0, -1):
+            for i in range(1, self._GRIDS_SIZE.y - 1):
+                if grid[i - 1, j] == LIGHT_MAX_LEVEL and not self._is_block_grid[i - 1, j]:
+                    grid[i, j] = LIGHT_MAX_LEVEL
+                else:
+                    grid[i, j] = max(grid[i, j], LIGHT_MAX_LEVEL - 1)
+
+    def apply_sky_light_changes(self, is_changed_grid):
+        """Take into account the cells of is_changed_grid, whose light has changed, possibly from outside the chunk.
+        Chunks that haven't been rendered yet have nothing to update, as they get their light when rendered.
+        """
+        if self.status < ChunkStatus.rendered:
+            return
+
+        self._mark_cells_dirty(is_changed_grid)
+        self._apply_sky_light_grid()
+
+    def _mark_cells_dirty(self, is_dirty_grid):
+        """Extend the dirty rect, which is the part of surf that needs redrawing, to the cells of is_dirty_grid.
         """
-        self._scaled_sky_light_surf = pg.transform.scale(self._sky_light_surf, CHUNK_PIX_SIZE, self._scaled_sky_light_surf)
+        dirty_is, dirty_js = np.nonzero(is_dirty_grid)
+        if len(dirty_is) == 0:
+            return
+
+        min_i, min_j = int(dirty_is.min()), int(dirty_js.min())
+        max_i, max_j = int(dirty_is.max()), int(dirty_js.max())
+        self._extend_dirty_rect(pg.Rect(
+            min_j * self._block_pix_size.x,
+            min_i * self._block_pix_size.y,
+            (max_j - min_j + 1) * self._block_pix_size.x,
+            (max_i - min_i + 1) * self._block_pix_size.y,
+            ))
+
+    def _extend_dirty_rect(self, dirty_rect):
+        if self._dirty_rect is None:
+            self._dirty_rect = dirty_rect
+        else:
+            self._dirty_rect.union_ip(dirty_rect)
+
+    def draw(self, block_pix_size=BLOCK_PIX_SIZE):
+        """Update lighting and draw the part of the chunk's surf that is dirty, rendering the chunk the first time it is
+        drawn at the level of detail of block_pix_size.
+        """
+        if self.status < ChunkStatus.rendered or block_pix_size != self._block_pix_size:
+            self._render(block_pix_size)
+        if self._dirty_rect is None:
+            return
+
+        dirty_rect = self._dirty_rect
+        self._dirty_rect = None
+
+        dirty_cells_rect = pg.Rect(
+            dirty_rect.x // self._block_pix_size.x,
+            dirty_rect.y // self._block_pix_size.y,
+            dirty_rect.w // self._block_pix_size.x,
+            dirty_rect.h // self._block_pix_size.y,
+            )
+        pg.transform.scale(
+            self._sky_light_surf.subsurface(dirty_cells_rect),
+            dirty_rect.size,
+            self._scaled_sky_light_surf.subsurface(dirty_rect),
+            )
         if not WHITE_WORLD:
-            self.surf.blit(self._blocks_surf, PIX_ORIGIN)
+            self.surf.blit(self._blocks_surf, dirty_rect, dirty_rect)
         else:
-            self.surf.blit(self._white_surf, PIX_ORIGIN)
+            self.surf.blit(self._white_surf, dirty_rect, dirty_rect)
 
-        self.surf.blit(self._scaled_sky_light_surf, PIX_ORIGIN, special_flags=pg.BLEND_MULT)
+        self.surf.blit(self._scaled_sky_light_surf, dirty_rect, dirty_rect, special_flags=pg.BLEND_MULT)
         if CHUNK_BORDERS:
-            pg.draw.rect(self.surf, C_BLACK, self._border_rect, 1)
+            pg.draw.rect(self.surf, C_BLACK, self.surf.get_rect(), 1)
+
+    def _draw_block(self, block_w_pos: WVec):
+        """Draw the block at block_w_pos, which has just changed, from the atlas. """
+        if self.status < ChunkStatus.rendered:
+            return
 
-    def _draw_block(self, block_w_pos: WVec, block_surf):
-        pix_shift = self._block_w_pos_to_pix_shift(block_w_pos)
-        self._blocks_surf.blit(block_surf, pix_shift)
+        i, j = self._block_w_pos_to_block_index(block_w_pos)
+        block_rect = pg.Rect(j * self._block_pix_size.x, i * self._block_pix_size.y, *self._block_pix_size)
+        pg.surfarray.blit_array(
+            self._blocks_surf.subsurface(block_rect), self._block_id_to_mapped_texture[self._block_ids[i, j]])
+        self._extend_dirty_rect(block_rect)
 
     # ==== MODIFY ====
 
+    def promote(self):
+        return self
+
     def req_break_block(self, block_w_pos: WVec):
         """
         Break block at block_w_pos if it exists and return result (success or failure).
         Then, update the chunk in consequence.
         """
-        block = self.blocks_map[block_w_pos]
-        if block.block_type == BlockType.bedrock:
+        block_index = self._block_w_pos_to_block_index(block_w_pos)
+        if self._block_ids[block_index] in (AIR_ID, BlockType.bedrock.id):
             return Result.failure
 
-        self.blocks_map.pop(block_w_pos, None)
-        self._update_is_block_grid()
-        self._update_colliders()
-        self._draw_block(block_w_pos, self._empty_block_surf)
+        self._block_ids[block_index] = AIR_ID
+        self._update_is_block_cell(block_w_pos)
+        self._update_colliders_around(block_w_pos)
+        self._draw_block(block_w_pos)
+        self.is_modified = True
         return Result.success
 
     def req_place_block(self, block_w_pos: WVec, block: Block):
@@ -286,22 +433,180 @@ class Chunk:
         Then, update the chunk in consequence.
         """
         # Don't replace existing blocks (by design this should already never happen):
-        if block_w_pos in self.blocks_map:
+        block_index = self._block_w_pos_to_block_index(block_w_pos)
+        if self._block_ids[block_index] != AIR_ID:
             return Result.failure
 
-        self.blocks_map[block_w_pos] = block
-        self._update_is_block_grid()
-        self._update_colliders()
-        self._draw_block(block_w_pos, block.surf)
+        self._block_ids[block_index] = block.block_type.id
+        self._update_is_block_cell(block_w_pos)
+        self._update_colliders_around(block_w_pos)
+        self._draw_block(block_w_pos)
+        self.is_modified = True
         return Result.success
 
     # ==== COLLECT DATA ====
 
     def collect_data(self):
         """
-        Return all the data necessary to recreate the chunk's current state.
+        Return all the data necessary to recreate the chunk's current state, which is its block ids.
+        """
+        return self._block_ids
+
+
+class UniformChunk(Chunk):
+    """Chunk made of a single block type (usually air or stone) and uniformly lit, which is most of the world.
+
+    Its blocks, colliders and lit surf are shared with all the uniform chunks of the same block type and light.
+    It keeps its own light grids, and lights like any chunk, but needs_promotion as soon as its light isn't uniform
+    anymore. It also needs to be promoted to a full Chunk before being edited.
+    """
+    _shared_block_ids = {}
+    _shared_colliders = {}
+    _shared_lit_surfs = {}
+
+    def __init__(self, w_pos: WVec, generator: WorldGenerator, block_id):
+        self._w_pos = w_pos
+        self._generator = generator
+        self._block_id = int(block_id)
+        self._block_ids = self._get_shared_block_ids(self._block_id)
+        self.blocks_map = ChunkBlocksMap(self)
+
+        self._is_block_grid = np.ones(self._GRIDS_SIZE, dtype=bool)
+        self._is_block_grid[0, 1:-1] = False
+        self._update_is_block_grid()
+
+        self._sky_light_grid = np.zeros(self._GRIDS_SIZE, dtype=int)
+        self._sky_light_level = 0
+        self._has_been_highest_lit = False
+
+        self.surf = None
+        self._dirty_rect = self._border_rect.copy()
+        self._block_pix_size = None
+
+        self._colliders = None
+
+        self.status = ChunkStatus.generated
+        self.is_modified = False
+
+    @staticmethod
+    def is_uniform(block_ids):
+        return bool((block_ids == block_ids.flat[0]).all())
+
+    @classmethod
+    def _get_shared_block_ids(cls, block_id):
+        try:
+            return cls._shared_block_ids[block_id]
+        except KeyError:
+            pass
+
+        block_ids = np.full((CHUNK_W_SIZE.y, CHUNK_W_SIZE.x), block_id, dtype=BLOCK_ID_DTYPE)
+        block_ids.flags.writeable = False
+        cls._shared_block_ids[block_id] = block_ids
+        return block_ids
+
+    @property
+    def colliders(self):
+        """The colliders shared by the uniform chunks of the same block type, built the first time they are needed. """
+        if self._colliders is None:
+            try:
+                self._colliders = self._shared_colliders[self._block_id]
+            except KeyError:
+                colliders = super().colliders
+                for collider in colliders:
+                    collider.flags.writeable = False
+                self._shared_colliders[self._block_id] = colliders
+        return self._colliders
+
+    @classmethod
+    def _get_shared_lit_surf(cls, block_id, sky_light_level, block_pix_size):
+        """Return the surf of the uniform chunks of block_id lit at sky_light_level, at the level of detail of
+        block_pix_size, drawing it the first time. It is drawn the same way Chunk.draw would.
         """
-        blocks_data = {}
-        for block_w_pos, block in self.blocks_map.items():
-            blocks_data[str(block_w_pos)] = str(block.block_type)
-        return {str(self._w_pos): blocks_data}
+        try:
+            return cls._shared_lit_surfs[block_id, sky_light_level, block_pix_size]
+        except KeyError:
+            pass
+
+        chunk_pix_size = block_pix_size * CHUNK_W_SIZE
+        surf = pg.Surface(chunk_pix_size)
+        if not WHITE_WORLD:
+            block_id_to_mapped_texture = cls._get_block_id_to_mapped_texture(block_pix_size, surf)
+            pg.surfarray.blit_array(surf, np.tile(block_id_to_mapped_texture[block_id], CHUNK_W_SIZE))
+        else:
+            surf.blit(cls._white_surf, PIX_ORIGIN)
+
+        color_int = light_level_to_color_int(sky_light_level)
+        sky_light_surf = pg.Surface(chunk_pix_size)
+        sky_light_surf.fill((color_int, color_int, color_int))
+        surf.blit(sky_light_surf, PIX_ORIGIN, special_flags=pg.BLEND_MULT)
+        if CHUNK_BORDERS:
+            pg.draw.rect(surf, C_BLACK, surf.get_rect(), 1)
+
+        cls._shared_lit_surfs[block_id, sky_light_level, block_pix_size] = surf
+        return surf
+
+    def apply_sky_light_changes(self, is_changed_grid):
+        sky_light_grid = self._sky_light_grid[1:-1, 1:-1]
+        if not self.is_uniform(sky_light_grid):
+            self.needs_promotion = True
+            return
+
+        sky_light_level = int(sky_light_grid[0, 0])
+        if sky_light_level != self._sky_light_level:
+            self._sky_light_level = sky_light_level
+            self._dirty_rect = self._border_rect.copy()
+
+    def draw(self, block_pix_size=BLOCK_PIX_SIZE):
+        if self._dirty_rect is None and block_pix_size == self._block_pix_size:
+            return
+
+        self._dirty_rect = None
+        self._block_pix_size = block_pix_size
+        self.surf = self._get_shared_lit_surf(self._block_id, self._sky_light_level, block_pix_size)
+        self.status = ChunkStatus.rendered
+
+    def promote(self):
+        """Return a full Chunk with the same blocks and light, to replace this one. """
+        chunk = Chunk(self._w_pos, self._generator, block_ids=self._block_ids.copy())
+        chunk._sky_light_grid[...] = self._sky_light_grid
+        chunk._is_block_grid[...] = self._is_block_grid
+        chunk._has_been_highest_lit = self._has_been_highest_lit
+        chunk.status = min(self.status, ChunkStatus.lit)
+        chunk.is_modified = self.is_modified
+        if self.status == ChunkStatus.rendered:
+            chunk.draw(self._block_pix_size)
+        return chunk
+
+    def req_break_block(self, block_w_pos: WVec):
+        raise TypeError("Uniform chunks need to be promoted before being edited.")
+
+    def req_place_block(self, block_w_pos: WVec, block: Block):
+        raise TypeError("Uniform chunks need to be promoted before being edited.")
+
+
+class ChunkBlocksMap(Mapping):
+    """Read-only view of a chunk's blocks as a mapping from block_w_pos to Block, for compatibility.
+    """
+    def __init__(self, chunk: Chunk):
+        self._chunk = chunk
+
+    def __getitem__(self, block_w_pos: WVec):
+        block_id = self._chunk.get_block_id_at_w_pos(block_w_pos)
+        if block_id is None or block_id == AIR_ID:
+            raise KeyError(block_w_pos)
+        return Block.from_id(block_id)
+
+    def __contains__(self, block_w_pos):
+        block_id = self._chunk.get_block_id_at_w_pos(block_w_pos)
+        return block_id is not None and block_id != AIR_ID
+
+    def __iter__(self):
+        block_w_poss, _ = self._chunk.block_w_poss_and_ids()
+        return iter(block_w_poss)
+
+    def __len__(self):
+        return np.count_nonzero(self._chunk._block_ids != AIR_ID)
+
+    def items(self):
+        block_w_poss, block_ids = self._chunk.block_w_poss_and_ids()
+        return [(block_w_pos, Block.from_id(block_id)) for block_w_pos, block_id in zip(block_w_poss, block_ids)]
@@ -1,8 +1,10 @@
-from math import sin
+import numpy as np
 
 from core.classes import WVec
 from core.constants import CHUNK_W_SIZE, WORLD_HEIGHT_BOUNDS
-from item.block import Block, BlockType
+from world.noise import PerlinNoise
+from world.heightmap import Heightmap
+from item.block import BlockType, AIR_ID, BLOCK_ID_DTYPE
 
 
 class WorldGenerator:
@@ -11,51 +13,59 @@ class WorldGenerator:
     BEDROCK_DEPTH = 5
 
     WORLD_HEIGHT_FREQ = 50
+    WORLD_HEIGHT_AMPLITUDE = 20
+    CAVES_FREQ = 10
     CAVES_PROBABILITY = -0.25
 
     def __init__(self, seed):
         self.seed = seed
+        self._noise = PerlinNoise(self.seed)
+        self.heightmap = Heightmap(self._gen_terrain_heights)
+
+    def _gen_terrain_heights(self, block_w_xs):
+        """Return the terrain height of each of the columns of block_w_xs, as an array of the same shape.
+        """
+        return self.WATER_HEIGHT + self.WORLD_HEIGHT_AMPLITUDE * self._noise.noise2(
+            0.062 + block_w_xs / self.WORLD_HEIGHT_FREQ, 0.5, octaves=5)
+
+    def gen_chunks_block_ids(self, chunk_w_poss):
+        """Return the block ids of several chunks at once, stacked along the first axis, each indexed like the interior
+        of the chunks' grids (row from the top, column).
+        """
+        chunk_w_poss = np.array(chunk_w_poss, dtype=int).reshape(-1, 2)
+        block_w_xs = chunk_w_poss[:, 0, np.newaxis, np.newaxis] + np.arange(CHUNK_W_SIZE.x)
+        block_w_ys = chunk_w_poss[:, 1, np.newaxis, np.newaxis] + np.arange(CHUNK_W_SIZE.y - 1, -1, -1)[:, np.newaxis]
 
-    def _choose_block_type_at_pos(self, block_w_pos):
         # Terrain height
-        # terrain_height = self.WATER_HEIGHT + 20 * noise.pnoise2(0.062 + block_w_pos.x/self.WORLD_HEIGHT_FREQ, self.seed, octaves=5)
-        terrain_height = self.WATER_HEIGHT + 4 * sin(block_w_pos.x * 50)
-
-        if block_w_pos.y < WORLD_HEIGHT_BOUNDS[0]:
-            block_type = BlockType.air
-        elif block_w_pos.y < self.BEDROCK_DEPTH:
-            block_type = BlockType.bedrock
-        elif block_w_pos.y < terrain_height - self.DIRT_DEPTH:
-            block_type = BlockType.stone
-        elif block_w_pos.y < terrain_height - 1:
-            block_type = BlockType.dirt
-        elif block_w_pos.y < terrain_height:
-            block_type = BlockType.grass
-        else:
-            block_type = BlockType.air
-
-        # # Caves
-        # if noise.pnoise3(0.0468 + block_w_pos.x/10, 0.1564 + block_w_pos.y/10, self.seed, octaves=5) < self.CAVES_PROBABILITY:
-        #     block_type = Material.air
-
-        # Return
-        if block_type == BlockType.air:
-            return None
-        return block_type
-
-    def gen_chunk_blocks(self, chunk_w_pos: WVec):
-        blocks_map = {}
-        for w_shift_x in range(CHUNK_W_SIZE.x):
-            for w_shift_y in range(CHUNK_W_SIZE.y):
-                block_w_pos = WVec(chunk_w_pos.x + w_shift_x, chunk_w_pos.y + w_shift_y)
-                block_type = self._choose_block_type_at_pos(block_w_pos)
-                if block_type is None:
-                    continue
-                blocks_map[block_w_pos] = Block(block_type)
-        return blocks_map
-
-    def load_chunk_blocks(self, blocks_data):
-        blocks_map = {}
-        for block_w_pos, block_type in blocks_data.items():
-            blocks_map[block_w_pos] = Block(block_type)
-        return blocks_map
+        terrain_heights = self.heightmap.get_terrain_heights(block_w_xs)
+
+        # Depth bands, from the bottom up: the first band containing a block gives its block type.
+        block_ids = np.select(
+            [
+                block_w_ys < WORLD_HEIGHT_BOUNDS[0],
+                block_w_ys < self.BEDROCK_DEPTH,
+                block_w_ys < terrain_heights - self.DIRT_DEPTH,
+                block_w_ys < terrain_heights - 1,
+                block_w_ys < terrain_heights,
+                ],
+            [AIR_ID, BlockType.bedrock.id, BlockType.stone.id, BlockType.dirt.id, BlockType.grass.id],
+            AIR_ID,
+            ).astype(BLOCK_ID_DTYPE)
+
+        # Caves, only carved in stone, so that they don't make holes in the surface nor in the bedrock.
+        stone_indices = np.nonzero(block_ids == BlockType.stone.id)
+        if len(stone_indices[0]) > 0:
+            is_cave = self._noise.noise3(
+                0.0468 + np.broadcast_to(block_w_xs, block_ids.shape)[stone_indices] / self.CAVES_FREQ,
+                0.1564 + np.broadcast_to(block_w_ys, block_ids.shape)[stone_indices] / self.CAVES_FREQ,
+                0.5,
+                octaves=5,
+                ) < self.CAVES_PROBABILITY
+            block_ids[tuple(indices[is_cave] for indices in stone_indices)] = AIR_ID
+
+        return block_ids
+
+    def gen_chunk_block_ids(self, chunk_w_pos: WVec):
+        """Return the chunk's block ids, indexed like the interior of the chunk's grids (row from the top, column).
+        """
+        return self.gen_chunks_block_ids([chunk_w_pos])[0]
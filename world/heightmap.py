@@ -0,0 +1,75 @@
+from collections import OrderedDict
+from math import ceil
+from threading import Lock
+
+import numpy as np
+
+
+class Heightmap:
+    """Cache of per-column data, keyed by block_w_x: the terrain height generated for the column, and the height of
+    its highest block.
+
+    Columns are evicted least recently used first once there are more than MAX_SIZE of them, as they can be generated
+    again. The highest block of columns that have been edited can't, so it is kept apart, and never evicted.
+    Terrain heights can be requested from the chunk generation workers, hence the lock around the cache.
+    """
+    MAX_SIZE = 2 ** 12
+
+    def __init__(self, gen_terrain_heights):
+        self._gen_terrain_heights = gen_terrain_heights
+        self._terrain_heights = OrderedDict()
+        self._terrain_heights_lock = Lock()
+        self._edited_highest_block_ys = {}
+
+    def _evict(self):
+        while len(self._terrain_heights) > self.MAX_SIZE:
+            self._terrain_heights.popitem(last=False)
+
+    def get_terrain_heights(self, block_w_xs):
+        """Return the terrain height of each of the columns of block_w_xs, as an array of the same shape, only
+        generating the ones that aren't cached.
+        """
+        unique_block_w_xs, inverse = np.unique(block_w_xs, return_inverse=True)
+        unique_terrain_heights = np.empty(len(unique_block_w_xs))
+
+        missing_indices = []
+        with self._terrain_heights_lock:
+            for index, block_w_x in enumerate(unique_block_w_xs.tolist()):
+                try:
+                    unique_terrain_heights[index] = self._terrain_heights[block_w_x]
+                except KeyError:
+                    missing_indices.append(index)
+                else:
+                    self._terrain_heights.move_to_end(block_w_x)
+
+        if missing_indices:
+            missing_terrain_heights = self._gen_terrain_heights(unique_block_w_xs[missing_indices])
+            unique_terrain_heights[missing_indices] = missing_terrain_heights
+            with self._terrain_heights_lock:
+                self._terrain_heights.update(zip(unique_block_w_xs[missing_indices].tolist(), missing_terrain_heights))
+                self._evict()
+
+        return unique_terrain_heights[inverse].reshape(np.shape(block_w_xs))
+
+    def get_terrain_height(self, block_w_x):
+        return float(self.get_terrain_heights(np.array([block_w_x]))[0])
+
+    def _get_generated_highest_block_y(self, block_w_x):
+        return ceil(self.get_terrain_height(block_w_x)) - 1
+
+    def get_highest_block_y(self, block_w_x):
+        """Return the height of the highest block of the column, generated or placed. """
+        try:
+            return self._edited_highest_block_ys[block_w_x]
+        except KeyError:
+            return self._get_generated_highest_block_y(block_w_x)
+
+    def set_highest_block_y(self, block_w_x, block_w_y):
+        if block_w_y == self._get_generated_highest_block_y(block_w_x):
+            self._edited_highest_block_ys.pop(block_w_x, None)
+        else:
+            self._edited_highest_block_ys[block_w_x] = block_w_y
+
+    def collect_data(self):
+        """Return the heights of the highest block of the edited columns, which can't be generated again. """
+        return sorted(self._edited_highest_block_ys.items())
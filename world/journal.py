@@ -0,0 +1,105 @@
+import os
+import struct
+from concurrent.futures import ThreadPoolExecutor
+
+from core.classes import WVec
+from core.constants import JOURNAL_FLUSH_DELAY
+
+
+class EditJournal:
+    """Append-only journal of the block edits of a world, which makes them durable between two saves.
+
+    Each edit is a fixed-size record: the block_w_pos, the ids of the block before and after it, and the tick it
+    happened at. Records are buffered, and appended then fsync'ed every JOURNAL_FLUSH_DELAY ticks, by a background
+    thread which does all the file operations, in order.
+    The journal is split into numbered segments: each save of the world starts a new one, and the former ones are
+    deleted once the save is written. Replaying the segments left on top of the save gives the latest state, even if
+    the former ones couldn't be deleted, as edits are replayed in order.
+    """
+    _RECORD_STRUCT = struct.Struct("<iiBBI")
+    _FILE_EXTENSION = ".bin"
+
+    def __init__(self, dir_path):
+        self._dir_path = dir_path
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._buffer = bytearray()
+        self._ticks_remaining = JOURNAL_FLUSH_DELAY
+
+        segments = self._get_segments(self._dir_path)
+        self.segment = segments[-1] + 1 if segments else 0
+
+    @classmethod
+    def _get_segments(cls, dir_path):
+        if not os.path.isdir(dir_path):
+            return []
+        return sorted(
+            int(file_name[:-len(cls._FILE_EXTENSION)])
+            for file_name in os.listdir(dir_path)
+            if file_name.endswith(cls._FILE_EXTENSION)
+            )
+
+    @classmethod
+    def _get_segment_path(cls, dir_path, segment):
+        return os.path.join(dir_path, f"{segment}{cls._FILE_EXTENSION}")
+
+    @classmethod
+    def read_edits(cls, dir_path):
+        """Return the edits of all the segments of the journal in dir_path, in order, as tuples of block_w_pos, old
+        block id, new block id and tick. A record cut by a crash at the end of a segment is ignored.
+        """
+        edits = []
+        for segment in cls._get_segments(dir_path):
+            with open(cls._get_segment_path(dir_path, segment), "rb") as file:
+                data = file.read()
+            n_records = len(data) // cls._RECORD_STRUCT.size
+            for x, y, old_block_id, new_block_id, tick in cls._RECORD_STRUCT.iter_unpack(
+                    data[:n_records * cls._RECORD_STRUCT.size]):
+                edits.append((WVec(x, y), old_block_id, new_block_id, tick))
+        return edits
+
+    def append(self, block_w_pos: WVec, old_block_id, new_block_id, tick):
+        self._buffer += self._RECORD_STRUCT.pack(block_w_pos.x, block_w_pos.y, old_block_id, new_block_id, tick)
+
+    def _write(self, segment, data):
+        try:
+            os.makedirs(self._dir_path, exist_ok=True)
+            with open(self._get_segment_path(self._dir_path, segment), "ab") as file:
+                file.write(data)
+                file.flush()
+                os.fsync(file.fileno())
+        except OSError as e:
+            print(f"Error: writing to the edit journal failed: {e}")
+
+    def _delete_segments_before(self, segment):
+        for former_segment in self._get_segments(self._dir_path):
+            if former_segment < segment:
+                os.remove(self._get_segment_path(self._dir_path, former_segment))
+
+    def flush(self):
+        """Make the buffered edits durable, from the background thread. """
+        if not self._buffer:
+            return
+        self._executor.submit(self._write, self.segment, bytes(self._buffer))
+        self._buffer.clear()
+
+    def tick(self):
+        if self._ticks_remaining > 0:
+            self._ticks_remaining -= 1
+            return
+        self._ticks_remaining = JOURNAL_FLUSH_DELAY
+        self.flush()
+
+    def start_segment(self):
+        """Start a new segment, for the edits happening after a save, and return it. """
+        self.flush()
+        self.segment += 1
+        return self.segment
+
+    def compact(self, segment):
+        """Delete the segments before segment, once the save started along with it is written. """
+        self._executor.submit(self._delete_segments_before, segment)
+
+    def close(self):
+        """Write the buffered edits, and wait for all the file operations to end. """
+        self.flush()
+        self._executor.shutdown()
@@ -0,0 +1,208 @@
+import numpy as np
+
+from core.constants import LIGHT_MAX_LEVEL, LIGHT_BLOCK_ATTENUATION, CHUNK_W_SIZE
+from core.classes import WVec
+
+
+def propagate_sky_light_buckets(sky_light_grid, is_block_grid):
+    """Propagate the sky light of the cells of sky_light_grid to the whole grid, in place.
+
+    Light levels are small integers, so instead of a heap, cells are popped from one bucket per light level,
+    from the brightest to the dimmest. A cell is final once popped, which a boolean grid keeps track of.
+    """
+    n_rows, n_cols = sky_light_grid.shape
+    grid = sky_light_grid.tolist()
+    is_block = is_block_grid.tolist()
+    visited = [[False] * n_cols for _ in range(n_rows)]
+
+    buckets = [[] for _ in range(LIGHT_MAX_LEVEL + 1)]
+    for i, j in zip(*np.nonzero(sky_light_grid > 1)):
+        buckets[grid[i][j]].append((int(i), int(j)))
+
+    for source_value in range(LIGHT_MAX_LEVEL, 1, -1):
+        bucket = buckets[source_value]
+        # The bucket can grow while being emptied, as light going down from the sky doesn't fade.
+        while bucket:
+            i, j = bucket.pop()
+            if visited[i][j]:
+                continue
+            visited[i][j] = True
+
+            if is_block[i][j]:
+                value = max(0, source_value - LIGHT_BLOCK_ATTENUATION)
+                down_value = value
+            else:
+                value = source_value - 1
+                down_value = LIGHT_MAX_LEVEL if source_value == LIGHT_MAX_LEVEL else value
+
+            for cell_i, cell_j, cell_value in (
+                    (i, j + 1, value),
+                    (i - 1, j, value),
+                    (i, j - 1, value),
+                    (i + 1, j, down_value),
+                    ):
+                if not (0 <= cell_i < n_rows and 0 <= cell_j < n_cols) or visited[cell_i][cell_j]:
+                    continue
+                if cell_value > grid[cell_i][cell_j]:
+                    grid[cell_i][cell_j] = cell_value
+                    if cell_value > 1:
+                        buckets[cell_value].append((cell_i, cell_j))
+
+    sky_light_grid[...] = grid
+
+
+def propagate_sky_light_relaxation(sky_light_grid, is_block_grid):
+    """Propagate the sky light of the cells of sky_light_grid to the whole grid, in place.
+
+    Every cell sends light to its four neighbors at once, with whole-array operations, until nothing changes anymore.
+    This converges to the same grid as propagate_sky_light_buckets, as light only ever decreases along its path.
+    """
+    is_max_from_sky = ~is_block_grid
+    while True:
+        sent_value = np.where(is_block_grid, sky_light_grid - LIGHT_BLOCK_ATTENUATION, sky_light_grid - 1)
+        sent_down_value = np.where(is_max_from_sky & (sky_light_grid == LIGHT_MAX_LEVEL), LIGHT_MAX_LEVEL, sent_value)
+
+        new_sky_light_grid = sky_light_grid.copy()
+        np.maximum(new_sky_light_grid[:, 1:], sent_value[:, :-1], out=new_sky_light_grid[:, 1:])
+        np.maximum(new_sky_light_grid[:-1, :], sent_value[1:, :], out=new_sky_light_grid[:-1, :])
+        np.maximum(new_sky_light_grid[:, :-1], sent_value[:, 1:], out=new_sky_light_grid[:, :-1])
+        np.maximum(new_sky_light_grid[1:, :], sent_down_value[:-1, :], out=new_sky_light_grid[1:, :])
+
+        if np.array_equal(new_sky_light_grid, sky_light_grid):
+            return
+        sky_light_grid[...] = new_sky_light_grid
+
+
+class SkyLightUpdater:
+    """Incremental update of the sky light of the existing chunks, after a single block has been placed or broken.
+
+    Instead of relighting whole chunks, a removal pass first darkens the cells whose light could have come through the
+    edited block, then an addition pass propagates light back into them from their lit surroundings, and from the
+    edited block itself. Only the cells whose light actually changes are touched, across chunk borders.
+    Cells above the highest existing chunk of a column are lit by the sky, and cells of missing chunks are dark.
+    """
+    def __init__(self, chunks_existing_map):
+        self._chunks_existing_map = chunks_existing_map
+        self._chunk_grids = {}
+        self._old_sky_light_grids = {}
+
+    def _get_cell(self, x, y):
+        """Return the chunk position, the light grid, the is_block grid and the index of the cell at (x, y).
+        Return None if the cell is in a chunk which doesn't exist.
+        """
+        chunk_w_pos = (x - x % CHUNK_W_SIZE.x, y - y % CHUNK_W_SIZE.y)
+        try:
+            sky_light_grid, is_block_grid = self._chunk_grids[chunk_w_pos]
+        except KeyError:
+            try:
+                chunk = self._chunks_existing_map[chunk_w_pos]
+            except KeyError:
+                return None
+            sky_light_grid, is_block_grid = chunk.get_sky_light_grids()
+            self._chunk_grids[chunk_w_pos] = sky_light_grid, is_block_grid
+            self._old_sky_light_grids[chunk_w_pos] = sky_light_grid.copy()
+
+        i = CHUNK_W_SIZE.y - 1 - (y - chunk_w_pos[1])
+        j = x - chunk_w_pos[0]
+        return chunk_w_pos, sky_light_grid, is_block_grid, (i, j)
+
+    def _is_under_sky(self, x, y):
+        """Return whether (x, y) is in the top row of a chunk having no chunk above it. """
+        if (y + 1) % CHUNK_W_SIZE.y != 0:
+            return False
+        return (x - x % CHUNK_W_SIZE.x, y + 1) not in self._chunks_existing_map
+
+    @staticmethod
+    def _sent_values(source_value, is_block):
+        """Return the light sent by a cell to its neighbors: to the right, up, left and down. """
+        if is_block:
+            value = max(0, source_value - LIGHT_BLOCK_ATTENUATION)
+            return value, value, value, value
+        value = source_value - 1
+        down_value = LIGHT_MAX_LEVEL if source_value == LIGHT_MAX_LEVEL else value
+        return value, value, value, down_value
+
+    @staticmethod
+    def _neigh_poss(x, y):
+        return (x + 1, y), (x, y + 1), (x - 1, y), (x, y - 1)
+
+    def update_around(self, block_w_pos, was_block):
+        """Update the light after the block at block_w_pos changed from was_block to its current state.
+        Return the changed cells of each chunk whose light changed, as boolean grids.
+        """
+        x, y = int(block_w_pos[0]), int(block_w_pos[1])
+        cell = self._get_cell(x, y)
+        if cell is None:
+            return {}
+        _, sky_light_grid, is_block_grid, index = cell
+        value = int(sky_light_grid[index])
+        old_sent_values = self._sent_values(value, was_block)
+        new_sent_values = self._sent_values(value, bool(is_block_grid[index]))
+
+        # Removal pass
+        sources = [(x, y)]
+        removal_queue = []
+        for neigh_pos, old_sent_value, new_sent_value in zip(self._neigh_poss(x, y), old_sent_values, new_sent_values):
+            if new_sent_value < old_sent_value:
+                self._remove_if_lit_by(neigh_pos, old_sent_value, removal_queue, sources)
+
+        removed_poss = []
+        while removal_queue:
+            pos, old_value, is_block = removal_queue.pop()
+            removed_poss.append(pos)
+            for neigh_pos, old_sent_value in zip(self._neigh_poss(*pos), self._sent_values(old_value, is_block)):
+                self._remove_if_lit_by(neigh_pos, old_sent_value, removal_queue, sources)
+
+        for pos in removed_poss:
+            if self._is_under_sky(*pos):
+                _, sky_light_grid, _, index = self._get_cell(*pos)
+                sky_light_grid[index] = LIGHT_MAX_LEVEL
+                sources.append(pos)
+
+        # Addition pass
+        buckets = [[] for _ in range(LIGHT_MAX_LEVEL + 1)]
+        for pos in sources:
+            _, sky_light_grid, _, index = self._get_cell(*pos)
+            buckets[sky_light_grid[index]].append(pos)
+
+        for source_value in range(LIGHT_MAX_LEVEL, 1, -1):
+            bucket = buckets[source_value]
+            while bucket:
+                pos = bucket.pop()
+                _, sky_light_grid, is_block_grid, index = self._get_cell(*pos)
+                if sky_light_grid[index] != source_value:
+                    continue
+                for neigh_pos, sent_value in zip(
+                        self._neigh_poss(*pos),
+                        self._sent_values(source_value, is_block_grid[index]),
+                        ):
+                    neigh_cell = self._get_cell(*neigh_pos)
+                    if neigh_cell is None:
+                        continue
+                    _, neigh_sky_light_grid, _, neigh_index = neigh_cell
+                    if sent_value > neigh_sky_light_grid[neigh_index]:
+                        neigh_sky_light_grid[neigh_index] = sent_value
+                        buckets[sent_value].append(neigh_pos)
+
+        changed_cells = {}
+        for chunk_w_pos, (sky_light_grid, _) in self._chunk_grids.items():
+            is_changed_grid = sky_light_grid != self._old_sky_light_grids[chunk_w_pos]
+            if is_changed_grid.any():
+                changed_cells[WVec(*chunk_w_pos)] = is_changed_grid
+        return changed_cells
+
+    def _remove_if_lit_by(self, pos, sent_value, removal_queue, sources):
+        """Darken the cell at pos if its light could come from sent_value, or else make it a source of the addition pass.
+        """
+        cell = self._get_cell(*pos)
+        if cell is None:
+            return
+        _, sky_light_grid, is_block_grid, index = cell
+        value = int(sky_light_grid[index])
+        if value == 0:
+            return
+        if value <= sent_value:
+            sky_light_grid[index] = 0
+            removal_queue.append((pos, value, bool(is_block_grid[index])))
+        else:
+            sources.append(pos)
@@ -0,0 +1,120 @@
+import numpy as np
+
+
+class PerlinNoise:
+    """Seeded gradient noise in 2D and 3D, evaluated on whole arrays of coordinates at once.
+
+    This is Ken Perlin's improved noise, whose permutation table is shuffled from the seed. Values are roughly
+    within [-1, 1], and are 0 on the integer lattice, so coordinates are usually offset by some fraction.
+    """
+    _PERM_SIZE = 256
+    # Gradients of the 4 diagonals in 2D, and of the 12 edges of a cube (with 4 repeated) in 3D, chosen by hash.
+    _GRADS_2 = np.array([(1, 1), (-1, 1), (1, -1), (-1, -1)], dtype=float)
+    _GRADS_3 = np.array([
+        (1, 1, 0), (-1, 1, 0), (1, -1, 0), (-1, -1, 0),
+        (1, 0, 1), (-1, 0, 1), (1, 0, -1), (-1, 0, -1),
+        (0, 1, 1), (0, -1, 1), (0, 1, -1), (0, -1, -1),
+        (1, 1, 0), (0, -1, 1), (-1, 1, 0), (0, -1, -1),
+        ], dtype=float)
+
+    def __init__(self, seed):
+        # Seeds are floats with a few decimals, hence the scaling before rounding them to an integer.
+        rng = np.random.default_rng(round(abs(seed) * 10 ** 5))
+        perm = rng.permutation(self._PERM_SIZE)
+        self._perm = np.concatenate((perm, perm))
+
+    @staticmethod
+    def _fade(t):
+        return t * t * t * (t * (t * 6 - 15) + 10)
+
+    @staticmethod
+    def _lerp(t, a, b):
+        return a + t * (b - a)
+
+    @staticmethod
+    def _split(coords):
+        """Return the lattice cell (wrapped to the permutation table) and the position within it, of each coordinate.
+        """
+        floored = np.floor(coords)
+        return floored.astype(int) & 255, coords - floored
+
+    @classmethod
+    def _grad2(cls, hash_, x, y):
+        """Dot product of (x, y) with the gradient chosen by hash_. """
+        grad = cls._GRADS_2[hash_ & 3]
+        return grad[..., 0] * x + grad[..., 1] * y
+
+    @classmethod
+    def _grad3(cls, hash_, x, y, z):
+        """Dot product of (x, y, z) with the gradient chosen by hash_. """
+        grad = cls._GRADS_3[hash_ & 15]
+        return grad[..., 0] * x + grad[..., 1] * y + grad[..., 2] * z
+
+    def _noise2(self, x, y):
+        perm = self._perm
+        xi, xf = self._split(x)
+        yi, yf = self._split(y)
+        u = self._fade(xf)
+        v = self._fade(yf)
+
+        a = perm[xi] + yi
+        b = perm[xi + 1] + yi
+        return self._lerp(
+            v,
+            self._lerp(u, self._grad2(perm[a], xf, yf), self._grad2(perm[b], xf - 1, yf)),
+            self._lerp(u, self._grad2(perm[a + 1], xf, yf - 1), self._grad2(perm[b + 1], xf - 1, yf - 1)),
+            )
+
+    def _noise3(self, x, y, z):
+        perm = self._perm
+        xi, xf = self._split(x)
+        yi, yf = self._split(y)
+        zi, zf = self._split(z)
+        u = self._fade(xf)
+        v = self._fade(yf)
+        w = self._fade(zf)
+
+        a = perm[xi] + yi
+        aa = perm[a] + zi
+        ab = perm[a + 1] + zi
+        b = perm[xi + 1] + yi
+        ba = perm[b] + zi
+        bb = perm[b + 1] + zi
+        return self._lerp(
+            w,
+            self._lerp(
+                v,
+                self._lerp(u, self._grad3(perm[aa], xf, yf, zf), self._grad3(perm[ba], xf - 1, yf, zf)),
+                self._lerp(u, self._grad3(perm[ab], xf, yf - 1, zf), self._grad3(perm[bb], xf - 1, yf - 1, zf)),
+                ),
+            self._lerp(
+                v,
+                self._lerp(u, self._grad3(perm[aa + 1], xf, yf, zf - 1), self._grad3(perm[ba + 1], xf - 1, yf, zf - 1)),
+                self._lerp(
+                    u,
+                    self._grad3(perm[ab + 1], xf, yf - 1, zf - 1),
+                    self._grad3(perm[bb + 1], xf - 1, yf - 1, zf - 1),
+                    ),
+                ),
+            )
+
+    @staticmethod
+    def _fractal(noise_func, coords, octaves, persistence, lacunarity):
+        """Sum octaves of noise_func, each of a higher frequency and a lower amplitude, normalized back to its range.
+        All the octaves are evaluated in a single call, stacked along a new first axis.
+        """
+        shape = np.broadcast(*coords).shape
+        frequencies = lacunarity ** np.arange(octaves)
+        amplitudes = persistence ** np.arange(octaves)
+        octave_coords = (np.multiply.outer(frequencies, np.broadcast_to(coord, shape)) for coord in coords)
+        return np.tensordot(amplitudes, noise_func(*octave_coords), axes=1) / amplitudes.sum()
+
+    def noise2(self, x, y, octaves=1, persistence=0.5, lacunarity=2.0):
+        """Return the 2D noise at the coordinates x and y, which are broadcast together. """
+        coords = (np.asarray(x, dtype=float), np.asarray(y, dtype=float))
+        return self._fractal(self._noise2, coords, octaves, persistence, lacunarity)
+
+    def noise3(self, x, y, z, octaves=1, persistence=0.5, lacunarity=2.0):
+        """Return the 3D noise at the coordinates x, y and z, which are broadcast together. """
+        coords = (np.asarray(x, dtype=float), np.asarray(y, dtype=float), np.asarray(z, dtype=float))
+        return self._fractal(self._noise3, coords, octaves, persistence, lacunarity)
@@ -0,0 +1,185 @@
+import mmap
+import os
+import struct
+import zlib
+from collections import defaultdict
+
+import numpy as np
+
+from core.classes import WVec, CVec
+from core.constants import CHUNK_W_SIZE, REGION_C_SIZE, REGION_COMPRESSION
+from core.funcs import w_to_c_vec
+from item.block import BLOCK_ID_DTYPE
+
+
+def get_region_c_pos(chunk_w_pos: WVec):
+    """Return the position of the region holding the chunk at chunk_w_pos, in regions. """
+    chunk_c_pos = w_to_c_vec(chunk_w_pos)
+    return CVec(chunk_c_pos.x // REGION_C_SIZE.x, chunk_c_pos.y // REGION_C_SIZE.y)
+
+
+def get_region_file_name(region_c_pos: CVec):
+    return f"r.{region_c_pos.x}.{region_c_pos.y}.bin"
+
+
+class RegionFile:
+    """Read-only access to a region file, which holds the blocks of a REGION_C_SIZE grid of chunks.
+
+    The file starts with a header: MAGIC, the format version, the position of the region, and a table with the offset
+    and the length of the data of each chunk, row by row, where missing chunks have a length of 0.
+    The data of a chunk is a byte telling whether it is zlib-compressed, followed by its block ids, as the bytes of its
+    (i, j) array.
+    The file is memory-mapped, so that reading a chunk only reads its entry of the table, and its data.
+    """
+    MAGIC = b"MFRG"
+    VERSION = 1
+    _HEADER_STRUCT = struct.Struct("<4sHii")
+    _ENTRY_STRUCT = struct.Struct("<II")
+    _N_CHUNKS = REGION_C_SIZE.x * REGION_C_SIZE.y
+    _DATA_OFFSET = _HEADER_STRUCT.size + _N_CHUNKS * _ENTRY_STRUCT.size
+
+    _RAW = 0
+    _COMPRESSED = 1
+
+    def __init__(self, path):
+        with open(path, "rb") as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, region_c_pos_x, region_c_pos_y = self._HEADER_STRUCT.unpack_from(self._mmap)
+        if magic != self.MAGIC or version != self.VERSION:
+            self.close()
+            raise ValueError(f"{path} isn't a region file of version {self.VERSION}.")
+        self.region_c_pos = CVec(region_c_pos_x, region_c_pos_y)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        self._mmap.close()
+
+    @classmethod
+    def _chunk_w_pos_to_index(cls, chunk_w_pos: WVec, region_c_pos: CVec):
+        chunk_c_pos = w_to_c_vec(chunk_w_pos)
+        return (
+            (chunk_c_pos.y - region_c_pos.y * REGION_C_SIZE.y) * REGION_C_SIZE.x
+            + chunk_c_pos.x - region_c_pos.x * REGION_C_SIZE.x
+            )
+
+    def _index_to_chunk_w_pos(self, index):
+        local_c_pos_y, local_c_pos_x = divmod(index, REGION_C_SIZE.x)
+        return WVec(
+            (self.region_c_pos.x * REGION_C_SIZE.x + local_c_pos_x) * CHUNK_W_SIZE.x,
+            (self.region_c_pos.y * REGION_C_SIZE.y + local_c_pos_y) * CHUNK_W_SIZE.y,
+            )
+
+    def _get_entry(self, index):
+        return self._ENTRY_STRUCT.unpack_from(self._mmap, self._HEADER_STRUCT.size + index * self._ENTRY_STRUCT.size)
+
+    def chunk_w_poss(self):
+        """Return the positions of the chunks stored in the region. """
+        return [self._index_to_chunk_w_pos(index) for index in range(self._N_CHUNKS) if self._get_entry(index)[1] > 0]
+
+    def read_chunk_block_ids(self, chunk_w_pos: WVec):
+        """Return the block ids of the chunk at chunk_w_pos, or None if it isn't stored in the region. """
+        if get_region_c_pos(chunk_w_pos) != self.region_c_pos:
+            return None
+
+        offset, length = self._get_entry(self._chunk_w_pos_to_index(chunk_w_pos, self.region_c_pos))
+        if length == 0:
+            return None
+
+        data = self._mmap[offset + 1:offset + length]
+        if self._mmap[offset] == self._COMPRESSED:
+            data = zlib.decompress(data)
+        return np.frombuffer(data, dtype=BLOCK_ID_DTYPE).reshape((CHUNK_W_SIZE.y, CHUNK_W_SIZE.x)).copy()
+
+    @classmethod
+    def write(cls, path, region_c_pos: CVec, block_ids_map: dict):
+        """Write the region file at path, made of the block ids of the chunks of block_ids_map, mapped by chunk_w_pos,
+        and return its size.
+        The file is replaced at once, so that a failing save doesn't corrupt it.
+        """
+        entries = [(0, 0)] * cls._N_CHUNKS
+        chunks_data = []
+        offset = cls._DATA_OFFSET
+        for chunk_w_pos, block_ids in block_ids_map.items():
+            data = np.ascontiguousarray(block_ids, dtype=BLOCK_ID_DTYPE).tobytes()
+            flag = cls._RAW
+            if REGION_COMPRESSION:
+                compressed_data = zlib.compress(data)
+                if len(compressed_data) < len(data):
+                    data = compressed_data
+                    flag = cls._COMPRESSED
+
+            entries[cls._chunk_w_pos_to_index(chunk_w_pos, region_c_pos)] = (offset, len(data) + 1)
+            chunks_data += (bytes((flag,)), data)
+            offset += len(data) + 1
+
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as file:
+            file.write(cls._HEADER_STRUCT.pack(cls.MAGIC, cls.VERSION, region_c_pos.x, region_c_pos.y))
+            for entry in entries:
+                file.write(cls._ENTRY_STRUCT.pack(*entry))
+            file.writelines(chunks_data)
+        os.replace(tmp_path, path)
+        return offset
+
+
+def write_regions(regions_dir_path, block_ids_map: dict, *, is_full=False):
+    """Store the block ids of the chunks of block_ids_map, mapped by chunk_w_pos, in the region files of
+    regions_dir_path, along with the other chunks these files already hold, and return the number of bytes written.
+    If is_full, the chunks of block_ids_map replace all the stored ones instead. The region files not rewritten are
+    only removed once all the others are written, so that a failing save always leaves a region file for every region.
+    """
+    os.makedirs(regions_dir_path, exist_ok=True)
+    block_ids_maps_per_region = defaultdict(dict)
+    for chunk_w_pos, block_ids in block_ids_map.items():
+        block_ids_maps_per_region[get_region_c_pos(chunk_w_pos)][chunk_w_pos] = block_ids
+
+    n_bytes = 0
+    for region_c_pos, region_block_ids_map in block_ids_maps_per_region.items():
+        path = os.path.join(regions_dir_path, get_region_file_name(region_c_pos))
+        if not is_full and os.path.isfile(path):
+            with RegionFile(path) as region_file:
+                stored_block_ids_map = {
+                    chunk_w_pos: region_file.read_chunk_block_ids(chunk_w_pos)
+                    for chunk_w_pos in region_file.chunk_w_poss()
+                    }
+            region_block_ids_map = {**stored_block_ids_map, **region_block_ids_map}
+        n_bytes += RegionFile.write(path, region_c_pos, region_block_ids_map)
+
+    if is_full:
+        written_file_names = {get_region_file_name(region_c_pos) for region_c_pos in block_ids_maps_per_region}
+        for file_name in os.listdir(regions_dir_path):
+            if file_name.endswith(".bin") and file_name not in written_file_names:
+                os.remove(os.path.join(regions_dir_path, file_name))
+    return n_bytes
+
+
+def index_regions(regions_dir_path):
+    """Return the positions of all the chunks stored in the region files of regions_dir_path, only reading their tables.
+    """
+    chunk_w_poss = []
+    if not os.path.isdir(regions_dir_path):
+        return chunk_w_poss
+
+    for file_name in os.listdir(regions_dir_path):
+        if not file_name.endswith(".bin"):
+            continue
+        with RegionFile(os.path.join(regions_dir_path, file_name)) as region_file:
+            chunk_w_poss += region_file.chunk_w_poss()
+    return chunk_w_poss
+
+
+def read_region_chunk_block_ids(regions_dir_path, chunk_w_pos: WVec):
+    """Return the block ids of the chunk at chunk_w_pos stored in the region files of regions_dir_path, or None if it
+    isn't stored.
+    """
+    path = os.path.join(regions_dir_path, get_region_file_name(get_region_c_pos(chunk_w_pos)))
+    if not os.path.isfile(path):
+        return None
+    with RegionFile(path) as region_file:
+        return region_file.read_chunk_block_ids(chunk_w_pos)
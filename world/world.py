@@ -1,16 +1,41 @@
 import json
 import os
 import random
+from collections import Counter, OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain
 from math import floor
+from time import perf_counter
+from typing import NamedTuple
 
+import numpy as np
 import pygame as pg
 
-from core.funcs import w_to_c_vec, w_to_pix_shift, w_to_c_to_w_vec
-from core.constants import CHUNK_W_SIZE, CHUNK_PIX_SIZE, C_KEY, ACTION_COOLDOWN_DELAY, BLOCK_BOUND_SHIFTS, DEBUG, \
-    LIGHT_MAX_RECURSION
-from core.classes import CBounds, CVec, WVec, Colliders, Result, WBounds, BlockSelection, Dir, LoadResult, PixVec
-from world.chunk import Chunk
-from item.block import BlockType, Block
+from core.funcs import w_to_c_vec, w_to_c_to_w_vec
+from core.constants import CHUNK_W_SIZE, CHUNK_PIX_SIZE, C_KEY, ACTION_COOLDOWN_DELAY, BLOCK_BOUND_SHIFTS, \
+    LIGHT_FRAME_TIME_BUDGET, WORLD_HEIGHT_BOUNDS, C_PLACEHOLDER, CHUNK_GENERATION_WORKERS, CHUNK_INTEGRATION_TIME_BUDGET, \
+    LIGHT_MAX_LEVEL, CHUNK_MAX_RESIDENT, CURRENT_SAVE_PATH, REGION_C_SIZE, REGIONS_DIR, \
+    JOURNAL_DIR, BLOCK_PIX_SIZE, PIX_ORIGIN
+from core.classes import CBounds, CVec, WVec, Result, WBounds, BlockSelection, Dir, LoadResult, PixVec, ChunkStatus
+from world.chunk import Chunk, UniformChunk
+from world.generation import WorldGenerator
+from world.lighting import SkyLightUpdater
+from world.journal import EditJournal
+from world.region import index_regions, read_region_chunk_block_ids, write_regions
+from utils.convert_save import convert_save
+from utils.save_utils import write_json_atomically
+from item.block import Block, AIR_ID
+
+
+class WorldSnapshot(NamedTuple):
+    """Copy of what needs writing to save a world in dir_path, which can be written from another thread. """
+    dir_path: str
+    data: dict
+    block_ids_map: dict  # Of the chunks to write, mapped by chunk_w_pos.
+    is_full: bool  # Whether the save replaces the chunks in dir_path, rather than updating them.
+    copied_chunk_w_poss: list  # Chunks to copy from the save in source_dir_path.
+    source_dir_path: str
+    journal_segment: int = None  # Segment of the journal started along with the snapshot, if any.
 
 
 class World:
@@ -18,26 +43,54 @@ class World:
 
     _empty_chunk_surf = pg.Surface(CHUNK_PIX_SIZE)
     _empty_chunk_surf.fill(C_KEY)
+    _placeholder_chunk_surf = pg.Surface(CHUNK_PIX_SIZE)  # Drawn in place of visible chunks still being generated.
+    _placeholder_chunk_surf.fill(C_PLACEHOLDER)
+    _EMPTY_C_VIEW = CBounds(CVec(0, 0), CVec(-1, -1))  # As max < min. Keeps the arguments, to remain of type int.
 
     def __init__(self):
         self._seed = random.randint(0, 2 ** 20) + 0.15681
+        self._generator = WorldGenerator(self._seed)
 
-        self.chunks_existing_map = {}
+        self.chunks_existing_map = OrderedDict()  # From the least recently visible chunk to the most.
         self._chunks_visible_map = {}
+        self._chunk_w_poss_visible = set()
 
-        self._c_view = CBounds(CVec(0, 0), CVec(0, 0))  # Needs to keep the arguments, in order to remain of type int.
-        self._max_view = WBounds(WVec(0, 0), WVec(0, 0))  # This too.
+        self._save_dir_path = CURRENT_SAVE_PATH
+        self._is_save_dir_synced = False  # Whether the save in _save_dir_path is of this world.
+        self._chunk_w_poss_saved = set()  # Chunks in the save that aren't loaded, as unneeded yet or unloaded.
+        self._chunk_w_poss_unsaved = set()  # Chunks modified since the last save, kept loaded until saved.
+        self._chunk_w_poss_saving = set()  # Chunks of the save being written, kept loaded until it is.
+        self._journal = None
 
-        self._max_surf = pg.Surface((0, 0))
+        self._n_ticks = 0
+
+        self._generation_executor = ThreadPoolExecutor(max_workers=CHUNK_GENERATION_WORKERS)
+        self._chunks_generating = {}  # Future of the block ids of the batch of each chunk, and its index in the batch.
+
+        self._c_view = self._EMPTY_C_VIEW
+        self._max_view = WBounds(WVec(0, 0), WVec(0, 0))  # Needs to keep the arguments, in order to remain of type int.
+
+        self._max_surf = pg.Surface((0, 0))  # Wraps around, each chunk having a slot that depends on its position.
+        self._max_surf_c_size = CVec(0, 0)
+        self._block_pix_size = BLOCK_PIX_SIZE  # Of the level of detail the max_surf is drawn at.
+        self._max_surf_dirty_rects = []  # Drawn since the last frame.
         self._force_draw = True
 
         self._action_cooldown_remaining = 0
 
+        self._chunks_to_light = deque()
+        self._chunks_to_light_set = set()
+        self.n_relights_this_frame = 0
+        self.n_relights_total = 0
+
     # ==== ADVANCE TIME ====
 
     def _tick(self):
+        self._n_ticks += 1
         if self._action_cooldown_remaining > 0:
             self._action_cooldown_remaining -= 1
+        if self._journal is not None:
+            self._journal.tick()
 
     # ==== GET DATA ====
 
@@ -65,10 +118,47 @@ class World:
 
         return neighboring_sky_light
 
+    def _get_or_integrate_chunk_map_at_w_pos(self, w_pos: WVec):
+        """Like _get_chunk_map_at_w_pos, but if the chunk is still being generated, wait for it and integrate it, and if
+        it is on disk, load it.
+        """
+        chunk_map = self._get_chunk_map_at_w_pos(w_pos)
+        if chunk_map is not None:
+            return chunk_map
+
+        chunk_w_pos = w_to_c_to_w_vec(w_pos)
+        if chunk_w_pos in self._chunk_w_poss_saved:
+            return chunk_w_pos, self._load_chunk_from_disk(chunk_w_pos)
+        if chunk_w_pos not in self._chunks_generating:
+            return None
+        return chunk_w_pos, self._integrate_chunk(chunk_w_pos)
+
     def get_sky_light_at_w_pos(self, w_pos: WVec):
-        _, chunk = self._get_chunk_map_at_w_pos(w_pos)
+        chunk_map = self._get_or_integrate_chunk_map_at_w_pos(w_pos)
+        if chunk_map is None:
+            return LIGHT_MAX_LEVEL
+        _, chunk = chunk_map
         return chunk.get_sky_light_at_w_pos(w_pos)
 
+    def _is_above_surface(self, chunk_w_pos: WVec):
+        """Return whether the chunk is above the highest block of each of its columns. """
+        heightmap = self._generator.heightmap
+        return all(
+            heightmap.get_highest_block_y(block_w_x) < chunk_w_pos.y
+            for block_w_x in range(chunk_w_pos.x, chunk_w_pos.x + CHUNK_W_SIZE.x)
+            )
+
+    def get_debug_info(self):
+        """Return the lines of text describing the state of the world in debug mode. """
+        n_chunks_per_status = Counter(chunk.status for chunk in self.chunks_existing_map.values())
+        return [
+            "chunks: " + ", ".join(f"{n_chunks_per_status[status]} {status.name}" for status in ChunkStatus),
+            f"relights: {self.n_relights_this_frame} this frame, {self.n_relights_total} total",
+            f"chunks waiting for light: {len(self._chunks_to_light)}",
+            f"chunks being generated: {len(self._chunks_generating)}",
+            f"chunks saved, not loaded: {len(self._chunk_w_poss_saved)}, unsaved: {len(self._chunk_w_poss_unsaved)}",
+            ]
+
     def _get_chunk_maps_around(self, w_pos: WVec, c_radius):
         chunks_map = {}
         for pos_x in range(
@@ -90,15 +180,18 @@ class World:
     def _get_blocks_map_around(self, w_pos: WVec, c_radius):
         blocks_map = {}
         for chunk in self._get_chunk_maps_around(w_pos, c_radius).values():
-            blocks_map.update(chunk.blocks_map)
+            blocks_map.update(chunk.blocks_map.items())
         return blocks_map
 
-    def get_colliders_around(self, w_pos: WVec, c_radius):
-        colliders = Colliders()
-        for chunk in self._get_chunk_maps_around(w_pos, c_radius).values():
-            for colliders_dir, chunk_colliders_dir in zip(colliders, chunk.colliders):
-                colliders_dir += chunk_colliders_dir
-        return colliders
+    def has_collider(self, block_w_pos: WVec, dir_):
+        """Return whether the block at block_w_pos has an exposed face in dir_, in constant time.
+        """
+        chunk_map = self._get_or_integrate_chunk_map_at_w_pos(block_w_pos)
+        if chunk_map is None:
+            return False
+
+        _, chunk = chunk_map
+        return chunk.has_collider(block_w_pos, dir_)
 
     def get_block_pos_and_space_pos(self, start_w_pos: WVec, end_w_pos: WVec, max_distance, *, substeps=5, max_rays=3) -> BlockSelection:
         w_vel = end_w_pos - start_w_pos
@@ -123,16 +216,16 @@ class World:
                 # Return early if there's no block at or next to block_w_pos:
                 return BlockSelection(None, None)
 
-        ray_origin_shift = WVec()
         w_dir_horiz, w_dir_vert = w_dirs
         if (w_dir_horiz == Dir.right) ^ (not got_block):
-            ray_origin_shift.x = BLOCK_BOUND_SHIFTS.min.x
+            ray_origin_shift_x = BLOCK_BOUND_SHIFTS.min.x
         else:
-            ray_origin_shift.x = BLOCK_BOUND_SHIFTS.max.x
+            ray_origin_shift_x = BLOCK_BOUND_SHIFTS.max.x
         if (w_dir_vert == Dir.up) ^ (not got_block):
-            ray_origin_shift.y = BLOCK_BOUND_SHIFTS.min.y
+            ray_origin_shift_y = BLOCK_BOUND_SHIFTS.min.y
         else:
-            ray_origin_shift.y = BLOCK_BOUND_SHIFTS.max.y
+            ray_origin_shift_y = BLOCK_BOUND_SHIFTS.max.y
+        ray_origin_shift = WVec(ray_origin_shift_x, ray_origin_shift_y)
 
         poss_to_check = set()
         for ray_index in range(max_rays):
@@ -234,87 +327,315 @@ class World:
         self._c_view = new_c_view
         return True
 
-    def _light_chunk(self, chunk_map, recursion_level=0):
-        """Lights the chunk and recursively calls itself to light surrounding chunks if needed.
+    def _req_light_chunk(self, chunk_w_pos):
+        """Queue the chunk at chunk_w_pos for lighting, unless it is already waiting for it. """
+        if chunk_w_pos in self._chunks_to_light_set:
+            return
+        self._chunks_to_light_set.add(chunk_w_pos)
+        self._chunks_to_light.append(chunk_w_pos)
+
+    def _light_queued_chunks(self):
+        """Light the queued chunks, and queue the neighbors whose lighting changes in consequence, until the light
+        converges or the time budget of the frame runs out, in which case the remaining chunks wait for the next frame.
+        Return the positions of the chunks that have been lit, which are drawn once afterwards if visible.
         """
-        chunk_w_pos, chunk = chunk_map
+        updated_chunk_poss = set()
+        deadline = perf_counter() + LIGHT_FRAME_TIME_BUDGET
+        while self._chunks_to_light and (not updated_chunk_poss or perf_counter() < deadline):
+            chunk_w_pos = self._chunks_to_light.popleft()
+            self._chunks_to_light_set.remove(chunk_w_pos)
 
-        updated_chunk_poss = {chunk_w_pos}
+            chunk = self.chunks_existing_map[chunk_w_pos]
+            req_relight = chunk.light(
+                self._get_neighboring_sky_light_data(chunk_w_pos),
+                is_above_surface=self._is_above_surface(chunk_w_pos),
+                )
+            if chunk.needs_promotion:
+                self._promote_chunk(chunk_w_pos)
+            for dir_ in req_relight:
+                neighbor_chunk_map = self._get_chunk_map_in_dir(chunk_w_pos, dir_)
+                if neighbor_chunk_map is not None:
+                    self._req_light_chunk(neighbor_chunk_map[0])
 
-        if recursion_level > LIGHT_MAX_RECURSION:
-            if DEBUG:
-                print("Max lighting recursion reached.")
-            return updated_chunk_poss
+            updated_chunk_poss.add(chunk_w_pos)
+            self.n_relights_this_frame += 1
+            self.n_relights_total += 1
 
-        req_relight = chunk.light(self._get_neighboring_sky_light_data(chunk_w_pos))
-        for dir_ in req_relight:
-            neighbor_chunk_map = self._get_chunk_map_in_dir(chunk_w_pos, dir_)
-            if neighbor_chunk_map is not None:
-                recursively_updated_chunk_poss = self._light_chunk(neighbor_chunk_map, recursion_level+1)
-                updated_chunk_poss.update(recursively_updated_chunk_poss)
         return updated_chunk_poss
 
-    def _draw_chunk(self, chunk_map):
-        updated_chunk_poss = self._light_chunk(chunk_map)
-        for chunk_w_pos in updated_chunk_poss:
-            self.chunks_existing_map[chunk_w_pos].draw()
-
-    def _create_chunk(self, chunk_w_pos, blocks_map=None):
-        """Instantiates a new Chunk, draws it, lights it, updates surrounding chunks' lighting if needed and returns it.
+    def _create_chunk(self, chunk_w_pos, block_ids, is_modified=False):
+        """Instantiates a new Chunk, queues it for lighting and returns it.
+        Modified chunks, which come from the disk, may have blocks above the generated terrain.
         """
-        chunk = Chunk(chunk_w_pos, self._seed, blocks_map)
+        if UniformChunk.is_uniform(block_ids):
+            chunk = UniformChunk(chunk_w_pos, self._generator, block_ids.flat[0])
+        else:
+            chunk = Chunk(chunk_w_pos, self._generator, block_ids=block_ids)
         self.chunks_existing_map[chunk_w_pos] = chunk
-        self._draw_chunk((chunk_w_pos, chunk))
+        if is_modified:
+            chunk.is_modified = True
+            self._raise_highest_block_ys(chunk_w_pos, block_ids)
+        self._req_light_chunk(chunk_w_pos)
         return chunk
 
-    def _update_chunks_visible(self):
+    def _req_gen_chunks(self, chunk_w_poss):
+        """Submit the generation of the chunks at chunk_w_poss that are neither existing nor being generated yet, as a
+        single batch, to the worker pool. The ones that are on disk are loaded instead.
+        """
+        new_chunk_w_poss = []
+        for chunk_w_pos in chunk_w_poss:
+            if chunk_w_pos in self.chunks_existing_map or chunk_w_pos in self._chunks_generating:
+                continue
+            if chunk_w_pos in self._chunk_w_poss_saved:
+                self._load_chunk_from_disk(chunk_w_pos)
+            else:
+                new_chunk_w_poss.append(chunk_w_pos)
+        if not new_chunk_w_poss:
+            return
+
+        future = self._generation_executor.submit(self._generator.gen_chunks_block_ids, new_chunk_w_poss)
+        for index, chunk_w_pos in enumerate(new_chunk_w_poss):
+            self._chunks_generating[chunk_w_pos] = future, index
+
+    def _req_prefetch_chunks(self, camera_vel: WVec):
+        """Request the generation of the ring of chunks just outside of the view, on the sides the camera moves to.
+        """
+        dir_x, dir_y = camera_vel.dir_()
+        ring_min = self._c_view.min - 1
+        ring_max = self._c_view.max + 1
+
+        c_poss = set()
+        if dir_x != 0:
+            c_pos_x = ring_max.x if dir_x > 0 else ring_min.x
+            c_poss.update((c_pos_x, c_pos_y) for c_pos_y in range(ring_min.y, ring_max.y + 1))
+        if dir_y != 0:
+            c_pos_y = ring_max.y if dir_y > 0 else ring_min.y
+            c_poss.update((c_pos_x, c_pos_y) for c_pos_x in range(ring_min.x, ring_max.x + 1))
+
+        self._req_gen_chunks([WVec(*c_pos) * CHUNK_W_SIZE for c_pos in sorted(c_poss)])
+
+    def _integrate_chunk(self, chunk_w_pos):
+        """Create the chunk at chunk_w_pos from its generated blocks, waiting for them if needed, and return it.
+        """
+        future, index = self._chunks_generating.pop(chunk_w_pos)
+        chunk = self._create_chunk(chunk_w_pos, future.result()[index])
+        if chunk_w_pos in self._chunk_w_poss_visible:
+            self._chunks_visible_map[chunk_w_pos] = chunk
+        return chunk
+
+    def _integrate_generated_chunks(self):
+        """Create the chunks whose generation is done, visible ones first, until the time budget of the frame runs out.
+        Chunks that don't fit in the budget wait for the next frame.
+        """
+        generated_chunk_w_poss = [
+            chunk_w_pos for chunk_w_pos, (future, _) in self._chunks_generating.items() if future.done()]
+        generated_chunk_w_poss.sort(key=lambda chunk_w_pos: chunk_w_pos not in self._chunk_w_poss_visible)
+
+        deadline = perf_counter() + CHUNK_INTEGRATION_TIME_BUDGET
+        for n_integrated, chunk_w_pos in enumerate(generated_chunk_w_poss):
+            if n_integrated > 0 and perf_counter() >= deadline:
+                break
+            self._integrate_chunk(chunk_w_pos)
+
+    def _promote_chunk(self, chunk_w_pos):
+        """Replace the chunk at chunk_w_pos by a full chunk if it is uniform, and return it.
+        """
+        chunk = self.chunks_existing_map[chunk_w_pos]
+        promoted_chunk = chunk.promote()
+        if promoted_chunk is chunk:
+            return chunk
+
+        self.chunks_existing_map[chunk_w_pos] = promoted_chunk
+        if chunk_w_pos in self._chunks_visible_map:
+            self._chunks_visible_map[chunk_w_pos] = promoted_chunk
+        return promoted_chunk
+
+    def _load_chunk_from_disk(self, chunk_w_pos: WVec):
+        """Create the chunk at chunk_w_pos from the save, and return it.
+        Saves of former versions may hold chunks that haven't been modified, which don't need saving again.
+        """
+        block_ids = read_region_chunk_block_ids(os.path.join(self._save_dir_path, REGIONS_DIR), chunk_w_pos)
+        self._chunk_w_poss_saved.remove(chunk_w_pos)
+        is_modified = not np.array_equal(block_ids, self._generator.gen_chunk_block_ids(chunk_w_pos))
+
+        chunk = self._create_chunk(chunk_w_pos, block_ids, is_modified)
+        if chunk_w_pos in self._chunk_w_poss_visible:
+            self._chunks_visible_map[chunk_w_pos] = chunk
+        return chunk
+
+    def _unload_chunk(self, chunk_w_pos: WVec):
+        """Remove the chunk at chunk_w_pos, which is saved if it has been modified, from memory.
+        Modified chunks are loaded back from the save, and the other ones are generated again.
+        """
+        chunk = self.chunks_existing_map.pop(chunk_w_pos)
+        if chunk.is_modified:
+            self._chunk_w_poss_saved.add(chunk_w_pos)
+
+    def _unload_least_recently_visible_chunks(self):
+        """Unload the chunks that have been visible the least recently, until there are at most CHUNK_MAX_RESIDENT.
+        Visible chunks, chunks waiting for light, and chunks modified since their last save was written are kept.
+        """
+        n_chunks_to_unload = len(self.chunks_existing_map) - CHUNK_MAX_RESIDENT
+        if n_chunks_to_unload <= 0:
+            return
+
+        chunk_w_poss_to_unload = []
+        for chunk_w_pos in self.chunks_existing_map:
+            if len(chunk_w_poss_to_unload) == n_chunks_to_unload:
+                break
+            if (chunk_w_pos in self._chunks_visible_map
+                    or chunk_w_pos in self._chunks_to_light_set
+                    or chunk_w_pos in self._chunk_w_poss_unsaved
+                    or chunk_w_pos in self._chunk_w_poss_saving):
+                continue
+            chunk_w_poss_to_unload.append(chunk_w_pos)
+
+        for chunk_w_pos in chunk_w_poss_to_unload:
+            self._unload_chunk(chunk_w_pos)
+
+    @staticmethod
+    def _get_chunk_w_poss_in_c_view(c_view: CBounds, excluded_c_view: CBounds):
+        """Return the positions of the chunks in c_view that aren't in excluded_c_view, only going through these. """
+        chunk_w_poss = []
+        for c_pos_x in range(c_view.min.x, c_view.max.x + 1):
+            if excluded_c_view.min.x <= c_pos_x <= excluded_c_view.max.x:
+                c_pos_ys = chain(
+                    range(c_view.min.y, min(c_view.max.y, excluded_c_view.min.y - 1) + 1),
+                    range(max(c_view.min.y, excluded_c_view.max.y + 1), c_view.max.y + 1),
+                    )
+            else:
+                c_pos_ys = range(c_view.min.y, c_view.max.y + 1)
+            chunk_w_poss += (WVec(c_pos_x * CHUNK_W_SIZE.x, c_pos_y * CHUNK_W_SIZE.y) for c_pos_y in c_pos_ys)
+        return chunk_w_poss
+
+    def _update_chunks_visible(self, former_c_view: CBounds):
+        """Update the visible chunks after c_view moved from former_c_view, and return the ones that have just become
+        visible. Only the chunks entering and leaving the view are gone through.
+        """
         self._max_view = WBounds(
             self._c_view.min * CHUNK_W_SIZE,
             (self._c_view.max+1) * CHUNK_W_SIZE,
             )
 
-        self._chunks_visible_map = {}
-        for chunk_w_pos_x in range(self._max_view.min.x, self._max_view.max.x, CHUNK_W_SIZE.x):
-            for chunk_w_pos_y in range(self._max_view.min.y, self._max_view.max.y, CHUNK_W_SIZE.y):
-                chunk_w_pos = WVec(chunk_w_pos_x, chunk_w_pos_y)
-                if chunk_w_pos in self.chunks_existing_map:
-                    chunk_visible = self.chunks_existing_map[chunk_w_pos]
-                else:
-                    chunk_visible = self._create_chunk(chunk_w_pos)
+        # Chunks leaving the view are the most recently visible ones.
+        for chunk_w_pos in self._get_chunk_w_poss_in_c_view(former_c_view, self._c_view):
+            self._chunk_w_poss_visible.discard(chunk_w_pos)
+            if self._chunks_visible_map.pop(chunk_w_pos, None) is not None:
+                self.chunks_existing_map.move_to_end(chunk_w_pos)
 
-                self._chunks_visible_map[chunk_w_pos] = chunk_visible
+        chunk_w_poss_entering = self._get_chunk_w_poss_in_c_view(self._c_view, former_c_view)
+        self._chunk_w_poss_visible.update(chunk_w_poss_entering)
+        self._req_gen_chunks(chunk_w_poss_entering)
+        for chunk_w_pos in chunk_w_poss_entering:
+            if chunk_w_pos in self.chunks_existing_map:
+                self._chunks_visible_map[chunk_w_pos] = self.chunks_existing_map[chunk_w_pos]
+        return chunk_w_poss_entering
 
     def _chunk_w_pos_to_pix_shift(self, chunk_w_pos: WVec):
-        max_view_w_shift = chunk_w_pos - self._max_view.min
-        return w_to_pix_shift(max_view_w_shift, CHUNK_PIX_SIZE, PixVec(self._max_surf.get_size()))
+        """Return the position of the slot of the chunk at chunk_w_pos in the max_surf, as a tuple, which is cheaper to
+        get for every visible chunk. Slots wrap around, so that the chunks of the view always have different ones, and
+        the ones of the chunks that are still visible don't move.
+        """
+        slot_x = chunk_w_pos.x // CHUNK_W_SIZE.x % self._max_surf_c_size.x
+        slot_y = chunk_w_pos.y // CHUNK_W_SIZE.y % self._max_surf_c_size.y
+        return (
+            slot_x * CHUNK_W_SIZE.x * self._block_pix_size.x,
+            (self._max_surf_c_size.y - 1 - slot_y) * CHUNK_W_SIZE.y * self._block_pix_size.y,
+            )
 
-    def _draw_max_surf(self):
-        self._update_chunks_visible()
+    def _get_max_surf_origin(self):
+        """Return the position in the max_surf of the top left corner of the max_view, extended to its size. """
+        top_left_chunk_c_pos = CVec(self._c_view.min.x, self._c_view.min.y + self._max_surf_c_size.y - 1)
+        return PixVec(*self._chunk_w_pos_to_pix_shift(top_left_chunk_c_pos * CHUNK_W_SIZE))
 
-        self._max_surf.fill(C_KEY)
+    def _draw_chunks_on_max_surf(self, chunk_w_poss):
+        """Draw the visible chunks at chunk_w_poss in their slot of the max_surf, and a placeholder for the ones that
+        are still being generated.
+        """
+        chunk_rect = pg.Rect(PIX_ORIGIN, self._block_pix_size * CHUNK_W_SIZE)
         blit_sequence = []
-        for chunk_w_pos, chunk in self._chunks_visible_map.items():
+        for chunk_w_pos in chunk_w_poss:
             pix_shift = self._chunk_w_pos_to_pix_shift(chunk_w_pos)
-            blit_sequence.append((chunk.surf, pix_shift))
-        self._max_surf.blits(blit_sequence, doreturn=False)
+            try:
+                chunk = self._chunks_visible_map[chunk_w_pos]
+            except KeyError:
+                chunk_surf = self._placeholder_chunk_surf
+            else:
+                chunk.draw(self._block_pix_size)
+                chunk_surf = chunk.surf
+            blit_sequence.append((chunk_surf, pix_shift, chunk_rect))
+        self._max_surf_dirty_rects += self._max_surf.blits(blit_sequence)
 
-    def _resize_max_surf(self, camera):
-        max_surf_pix_size = (w_to_c_vec(camera.w_size) + 2) * CHUNK_PIX_SIZE
-        self._max_surf = pg.transform.scale(self._max_surf, max_surf_pix_size)
+    def _draw_max_surf(self):
+        self._max_surf.fill(C_KEY)
+        self._draw_chunks_on_max_surf(self._get_chunk_w_poss_in_c_view(self._c_view, self._EMPTY_C_VIEW))
+        self._max_surf_dirty_rects = [self._max_surf.get_rect()]
+
+    def _draw_chunk_on_max_surf(self, chunk_w_pos):
+        """Draw a single chunk and redraw its slot in the max_surf, if it is visible.
+        Chunks that aren't visible keep their dirty rect until they are.
+        """
+        try:
+            chunk = self._chunks_visible_map[chunk_w_pos]
+        except KeyError:
+            return
+
+        chunk.draw(self._block_pix_size)
+        self._max_surf_dirty_rects.append(self._max_surf.blit(chunk.surf, self._chunk_w_pos_to_pix_shift(chunk_w_pos)))
+
+    def _resize_max_surf(self, max_surf_c_size: CVec, block_pix_size: PixVec):
+        """Resize the max_surf to draw it at the level of detail of block_pix_size, which moves all the slots of the
+        chunks.
+        """
+        self._max_surf_c_size = max_surf_c_size
+        self._block_pix_size = block_pix_size
+        self._max_surf = pg.Surface(max_surf_c_size * block_pix_size * CHUNK_W_SIZE)
 
     def draw_and_tick(self, camera):
+        """Only the chunks entering the view are drawn on the max_surf as the camera moves, the other ones keeping their
+        slot. It is only drawn again as a whole when the view can't fit in it anymore, or when it is resized.
+        Far from the world, chunks are drawn at a lower level of detail, which keeps the size of the max_surf about
+        the same however many chunks are visible.
+        """
+        self.n_relights_this_frame = 0
+        former_c_view = self._c_view
         are_new_chunks = self._update_c_view(camera)
-        if needs_redrawing := (camera.is_zooming or self._force_draw):
-            self._resize_max_surf(camera)
+        # Rounded up to powers of two, so that zooming only resizes it once in a while.
+        max_surf_c_size = CVec(*(1 << (c_size - 1).bit_length() for c_size in w_to_c_vec(camera.w_size) + 2))
+        block_pix_size = camera.lod_block_pix_size
+        if needs_redrawing := (
+                max_surf_c_size != self._max_surf_c_size or block_pix_size != self._block_pix_size or self._force_draw):
+            self._resize_max_surf(max_surf_c_size, block_pix_size)
             self._force_draw = False
-        if are_new_chunks or needs_redrawing:
+        if are_new_chunks:
+            chunk_w_poss_entering = self._update_chunks_visible(former_c_view)
+        if needs_redrawing:
             self._draw_max_surf()
-        camera.draw_world(self._max_surf, self._max_view.min)
+        elif are_new_chunks:
+            self._draw_chunks_on_max_surf(chunk_w_poss_entering)
+        if are_new_chunks:
+            self._req_prefetch_chunks(camera.vel)
+        self._integrate_generated_chunks()
+        self._unload_least_recently_visible_chunks()
+        for chunk_w_pos in self._light_queued_chunks():
+            self._draw_chunk_on_max_surf(chunk_w_pos)
+        camera.draw_world(self._max_surf, self._max_view.min, self._get_max_surf_origin(), self._max_surf_dirty_rects)
+        self._max_surf_dirty_rects = []
         self._tick()
 
-    def _redraw_chunk(self, chunk_map):
-        self._draw_chunk(chunk_map)
-        self._force_draw = True
+    def _relight_around_block(self, chunk_w_pos, block_w_pos, was_block):
+        """Update the light around the block at block_w_pos, which has just been broken or placed in the chunk at
+        chunk_w_pos, and redraw the chunks that changed.
+        """
+        changed_cells = SkyLightUpdater(self.chunks_existing_map).update_around(block_w_pos, was_block)
+        for changed_chunk_w_pos, is_changed_grid in changed_cells.items():
+            changed_chunk = self.chunks_existing_map[changed_chunk_w_pos]
+            changed_chunk.apply_sky_light_changes(is_changed_grid)
+            if changed_chunk.needs_promotion:
+                self._promote_chunk(changed_chunk_w_pos)
+
+        for updated_chunk_w_pos in changed_cells.keys() | {chunk_w_pos}:
+            self._draw_chunk_on_max_surf(updated_chunk_w_pos)
 
     # ==== MODIFY ====
 
@@ -359,12 +680,16 @@ class World:
         if chunk_map is None:
             return
 
-        chunk_w_pos, chunk = chunk_map
+        chunk_w_pos, _ = chunk_map
+        chunk = self._promote_chunk(chunk_w_pos)
+        block_id = chunk.get_block_id_at_w_pos(block_w_pos)
         result = chunk.req_break_block(block_w_pos)
         if result == Result.failure:
             return
 
-        self._redraw_chunk(chunk_map)
+        self._record_edit(chunk_w_pos, block_w_pos, block_id, AIR_ID)
+        self._lower_highest_block_y(block_w_pos)
+        self._relight_around_block(chunk_w_pos, block_w_pos, was_block=True)
 
     def _place_block(self, block_w_pos: WVec, block: Block):
         """Request placing of the block of the given block_type at block_w_pos to the relevant chunk.
@@ -374,47 +699,199 @@ class World:
         if chunk_map is None:
             return
 
-        chunk_w_pos, chunk = chunk_map
+        chunk_w_pos, _ = chunk_map
+        chunk = self._promote_chunk(chunk_w_pos)
         result = chunk.req_place_block(block_w_pos, block=block)
         if result == Result.failure:
             return
 
-        self._redraw_chunk(chunk_map)
+        self._record_edit(chunk_w_pos, block_w_pos, AIR_ID, block.block_type.id)
+        self._raise_highest_block_y(block_w_pos)
+        self._relight_around_block(chunk_w_pos, block_w_pos, was_block=False)
+
+    def _record_edit(self, chunk_w_pos: WVec, block_w_pos: WVec, old_block_id, new_block_id):
+        """Mark the chunk as unsaved, and journal the edit, if the journal is started. """
+        self._chunk_w_poss_unsaved.add(chunk_w_pos)
+        if self._journal is not None:
+            self._journal.append(block_w_pos, int(old_block_id), int(new_block_id), self._n_ticks)
+
+    def _raise_highest_block_y(self, block_w_pos: WVec):
+        """Update the heightmap after a block has been placed at block_w_pos. """
+        heightmap = self._generator.heightmap
+        if block_w_pos.y > heightmap.get_highest_block_y(block_w_pos.x):
+            heightmap.set_highest_block_y(block_w_pos.x, block_w_pos.y)
+
+    def _raise_highest_block_ys(self, chunk_w_pos: WVec, block_ids):
+        """Update the heightmap with the highest block of each column of the chunk at chunk_w_pos. """
+        is_block = block_ids != AIR_ID
+        for j in np.nonzero(is_block.any(axis=0))[0].tolist():
+            i = int(np.argmax(is_block[:, j]))
+            self._raise_highest_block_y(WVec(chunk_w_pos.x + j, chunk_w_pos.y + CHUNK_W_SIZE.y - 1 - i))
+
+    def _lower_highest_block_y(self, block_w_pos: WVec):
+        """Update the heightmap after the block at block_w_pos has been broken, looking for the next block below it.
+        Blocks of chunks which don't exist are assumed to be there, as they could have been placed.
+        """
+        heightmap = self._generator.heightmap
+        if block_w_pos.y != heightmap.get_highest_block_y(block_w_pos.x):
+            return
+
+        block_w_y = block_w_pos.y - 1
+        while block_w_y >= WORLD_HEIGHT_BOUNDS.x:
+            below_block_w_pos = WVec(block_w_pos.x, block_w_y)
+            chunk_map = self._get_chunk_map_at_w_pos(below_block_w_pos)
+            if chunk_map is None or chunk_map[1].get_block_id_at_w_pos(below_block_w_pos) != AIR_ID:
+                break
+            block_w_y -= 1
+        heightmap.set_highest_block_y(block_w_pos.x, block_w_y)
 
     # ==== SAVE AND LOAD ====
 
     def load_from_disk(self, dir_path) -> LoadResult:
+        self._save_dir_path = dir_path
+        self._is_save_dir_synced = False
+        self._chunk_w_poss_saved = set()
+
         try:
             with open(os.path.join(dir_path, self._SAVE_FILE_NAME)) as file:
                 data = json.load(file)
         except FileNotFoundError:
             return LoadResult.no_file
 
-        if data["chunk_w_size"] != CHUNK_W_SIZE:
+        if tuple(data["chunk_w_size"]) != CHUNK_W_SIZE:
+            return LoadResult.incompatible
+        try:
+            is_converted = convert_save(dir_path)
+        except ValueError as e:
+            print(f"Error: couldn't convert the save: {e}")
+            return LoadResult.incompatible
+        if is_converted:
+            return self.load_from_disk(dir_path)
+        if tuple(data["region_c_size"]) != REGION_C_SIZE:
             return LoadResult.incompatible
 
         self._seed = data["seed"]
+        self._generator = WorldGenerator(self._seed)
+        self._chunks_generating = {}
 
-        chunks_map = {}
-        for chunk_w_pos_str, blocks_data_str in data["chunks_data"].items():
-            chunk_w_pos = eval(chunk_w_pos_str)
-            blocks_map = {}
-            for block_w_pos_str, block_type_str in blocks_data_str.items():
-                blocks_map[eval(block_w_pos_str)] = eval(block_type_str)
-            chunks_map[chunk_w_pos] = blocks_map
-
-        for chunk_w_pos, blocks_map in sorted(chunks_map.items(), key=lambda x: -x[0][1]):
-            self.chunks_existing_map[chunk_w_pos] = self._create_chunk(chunk_w_pos, blocks_map)
+        # Edited columns are known from the start, so that the saved chunks shade the ones below them before they load.
+        for block_w_x, block_w_y in data.get("edited_highest_block_ys", []):
+            self._generator.heightmap.set_highest_block_y(block_w_x, block_w_y)
+
+        # Saved chunks are only indexed, and loaded once they are visible or needed by physics, like generated ones.
+        self._chunk_w_poss_saved = set(index_regions(os.path.join(dir_path, REGIONS_DIR)))
+        self._is_save_dir_synced = True
+        self._replay_journal(os.path.join(dir_path, JOURNAL_DIR))
         return LoadResult.success
 
+    def _replay_journal(self, journal_dir_path):
+        """Apply the edits of the journal, which happened after the last save of the world, on top of it.
+        The edited chunks are created right away, and are unsaved, so that the next save compacts the journal into it.
+        """
+        edits = EditJournal.read_edits(journal_dir_path)
+        block_ids_map = {}
+        for block_w_pos, _, new_block_id, _ in edits:
+            chunk_w_pos = w_to_c_to_w_vec(block_w_pos)
+            if chunk_w_pos not in block_ids_map:
+                if chunk_w_pos in self._chunk_w_poss_saved:
+                    self._chunk_w_poss_saved.remove(chunk_w_pos)
+                    block_ids_map[chunk_w_pos] = read_region_chunk_block_ids(
+                        os.path.join(self._save_dir_path, REGIONS_DIR), chunk_w_pos)
+                else:
+                    block_ids_map[chunk_w_pos] = self._generator.gen_chunk_block_ids(chunk_w_pos)
+            block_index = (CHUNK_W_SIZE.y - 1 - (block_w_pos.y - chunk_w_pos.y), block_w_pos.x - chunk_w_pos.x)
+            block_ids_map[chunk_w_pos][block_index] = new_block_id
+
+        for chunk_w_pos, block_ids in sorted(block_ids_map.items(), key=lambda x: -x[0][1]):
+            self._create_chunk(chunk_w_pos, block_ids, is_modified=True)
+            self._chunk_w_poss_unsaved.add(chunk_w_pos)
+        for block_w_pos, _, new_block_id, _ in edits:
+            if new_block_id == AIR_ID:
+                self._lower_highest_block_y(block_w_pos)
+            else:
+                self._raise_highest_block_y(block_w_pos)
+
+    def start_journal(self):
+        """Start journaling the edits to the save dir, which makes them durable before the world is saved. """
+        self._journal = EditJournal(os.path.join(self._save_dir_path, JOURNAL_DIR))
+
+    def close_journal(self):
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+
+    def _is_save_dir(self, dir_path):
+        return os.path.abspath(dir_path) == os.path.abspath(self._save_dir_path)
+
+    def snapshot(self, dir_path) -> WorldSnapshot:
+        """Copy what needs writing to save the world in dir_path. If dir_path is the save dir, end_saving needs to be
+        called once the snapshot is written.
+        Only modified chunks are saved, as the other ones can be generated again from the seed. If dir_path already
+        holds the save of the world, only the chunks modified since the last save are, which is cheap enough to do
+        between frames.
+        """
+        is_save_dir = self._is_save_dir(dir_path)
+        is_full = not (is_save_dir and self._is_save_dir_synced)
+        if is_full:
+            chunk_w_poss = [chunk_w_pos for chunk_w_pos, chunk in self.chunks_existing_map.items() if chunk.is_modified]
+        else:
+            chunk_w_poss = self._chunk_w_poss_unsaved
+        snapshot = WorldSnapshot(
+            dir_path=dir_path,
+            data={
+                "seed": self._seed,
+                "chunk_w_size": tuple(int(x) for x in CHUNK_W_SIZE),
+                "region_c_size": tuple(int(x) for x in REGION_C_SIZE),
+                "edited_highest_block_ys": self._generator.heightmap.collect_data(),
+                },
+            block_ids_map={
+                chunk_w_pos: self.chunks_existing_map[chunk_w_pos].collect_data().copy() for chunk_w_pos in chunk_w_poss},
+            is_full=is_full,
+            # Chunks that aren't loaded are only in the save dir, which is being replaced or isn't the one written.
+            copied_chunk_w_poss=list(self._chunk_w_poss_saved) if is_full else [],
+            source_dir_path=self._save_dir_path,
+            journal_segment=self._journal.start_segment() if is_save_dir and self._journal is not None else None,
+            )
+
+        if is_save_dir:
+            self._is_save_dir_synced = True
+            self._chunk_w_poss_saving |= snapshot.block_ids_map.keys()
+            self._chunk_w_poss_unsaved = set()
+        return snapshot
+
+    def end_saving(self, snapshot: WorldSnapshot, is_written):
+        """Take into account that the snapshot of the save dir has been written, or that writing it failed, in which
+        case its chunks are saved again next time.
+        """
+        if not self._is_save_dir(snapshot.dir_path):
+            return
+
+        if not is_written:
+            self._chunk_w_poss_unsaved |= self._chunk_w_poss_saving
+            if snapshot.is_full:
+                self._is_save_dir_synced = False
+        elif snapshot.journal_segment is not None and self._journal is not None:
+            # The edits of the former segments are all in the save now.
+            self._journal.compact(snapshot.journal_segment)
+        self._chunk_w_poss_saving = set()
+
+    @classmethod
+    def write_snapshot(cls, snapshot: WorldSnapshot):
+        """Write the snapshot to the disk and return the number of bytes written.
+        Only the snapshot and the disk are accessed, so that it can run on another thread than the world's.
+        """
+        os.makedirs(snapshot.dir_path, exist_ok=True)
+        regions_dir_path = os.path.join(snapshot.dir_path, REGIONS_DIR)
+        block_ids_map = snapshot.block_ids_map.copy()
+        for chunk_w_pos in snapshot.copied_chunk_w_poss:
+            block_ids_map[chunk_w_pos] = read_region_chunk_block_ids(
+                os.path.join(snapshot.source_dir_path, REGIONS_DIR), chunk_w_pos)
+
+        n_bytes = write_regions(regions_dir_path, block_ids_map, is_full=snapshot.is_full)
+        n_bytes += write_json_atomically(os.path.join(snapshot.dir_path, cls._SAVE_FILE_NAME), snapshot.data)
+        return n_bytes
+
     def save_to_disk(self, dir_path):
-        data = {
-            "seed": self._seed,
-            "chunk_w_size": tuple(int(x) for x in CHUNK_W_SIZE),
-            "chunks_data": {},
-            }
-        for chunk in self.chunks_existing_map.values():
-            data["chunks_data"].update(chunk.collect_data())
-
-        with open(os.path.join(dir_path, self._SAVE_FILE_NAME), "w") as file:
-            json.dump(data, file, indent=4)
+        snapshot = self.snapshot(dir_path)
+        self.write_snapshot(snapshot)
+        self.end_saving(snapshot, is_written=True)